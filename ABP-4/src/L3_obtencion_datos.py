@@ -18,15 +18,31 @@ Estructura de directorios esperada:
         ├── df_categorias.csv
         ├── df_ventas_2025.csv
         ├── df_ventas_2026.csv
-        └── df_consolidado.csv       ← resultado
+        ├── df_consolidado.csv       ← resultado
+        ├── df_consolidado.parquet   ← resultado (formato="parquet")
+        └── ventas_consolidado.db    ← resultado (formato="sqlite", codificado)
+
+Las columnas de texto repetidas (nombre, región, producto, canal, …) se
+mantienen como pd.Categorical (codificación por diccionario) desde la
+lectura hasta la escritura: la memoria crece con los valores distintos,
+no con la cantidad de ventas. Los formatos "sqlite" y "parquet" también
+las escriben codificadas (cada texto distinto una sola vez).
 """
 
+import importlib.util
 import os
 import warnings
 
 import numpy as np
 import pandas as pd
 
+try:
+    from src.almacen_sqlite import NOMBRE_DB, guardar_sqlite
+    from src.instrumentacion import etapa
+except ModuleNotFoundError:                 # ejecución directa desde src/
+    from almacen_sqlite import NOMBRE_DB, guardar_sqlite
+    from instrumentacion import etapa
+
 warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
 
 # ---------------------------------------------------------------------------
@@ -39,6 +55,15 @@ DIR_DATA  = os.path.join(_DIR_ROOT, "data")
 SEPARADOR = "-" * 60
 SEPARADOR_DOBLE = "=" * 60
 
+# Columnas de texto que se leen como "category" (codificadas por diccionario)
+COLUMNAS_CATEGORICAS = {
+    "df_clientes.csv":    ["nombre", "apellido", "email", "genero", "region", "pais"],
+    "df_productos.csv":   ["nombre_producto"],
+    "df_categorias.csv":  ["nombre_categoria"],
+    "df_ventas_2025.csv": ["canal_venta"],
+    "df_ventas_2026.csv": ["canal_venta"],
+}
+
 
 # ===========================================================================
 # 1. CARGA DE ARCHIVOS CSV
@@ -48,6 +73,9 @@ def cargar_csv(nombre: str, parse_dates: list = None) -> pd.DataFrame:
     """
     Carga un CSV desde data/ y retorna un DataFrame.
 
+    Las columnas listadas en COLUMNAS_CATEGORICAS se leen directamente
+    como "category", sin materializar un string por fila.
+
     Parámetros
     ----------
     nombre       : str   – Nombre del archivo (incluye .csv).
@@ -58,7 +86,10 @@ def cargar_csv(nombre: str, parse_dates: list = None) -> pd.DataFrame:
     pd.DataFrame
     """
     ruta = os.path.join(DIR_DATA, nombre)
-    df = pd.read_csv(ruta, parse_dates=parse_dates, encoding="utf-8")
+    with etapa(f"lectura.{nombre}") as m:
+        dtype = {c: "category" for c in COLUMNAS_CATEGORICAS.get(nombre, [])}
+        df = pd.read_csv(ruta, parse_dates=parse_dates, dtype=dtype, encoding="utf-8")
+        m.filas_salida = len(df)
     print(f"  ✔  {nombre:<30}  {df.shape[0]:>5} filas × {df.shape[1]} cols")
     return df
 
@@ -88,6 +119,19 @@ def cargar_fuentes() -> tuple:
 # 2. UNIFICACIÓN EN UN ÚNICO DATAFRAME
 # ===========================================================================
 
+def _alinear_categorias(dfs: list) -> list:
+    """
+    Da a las columnas categóricas comunes el mismo conjunto de categorías
+    en todos los DataFrames. pd.concat sólo conserva el dtype "category"
+    cuando las categorías coinciden; si no, vuelve a strings (object).
+    """
+    comunes = set.intersection(*(set(df.select_dtypes("category").columns) for df in dfs))
+    for col in comunes:
+        categorias = pd.api.types.union_categoricals([df[col] for df in dfs]).categories
+        dfs = [df.assign(**{col: df[col].cat.set_categories(categorias)}) for df in dfs]
+    return dfs
+
+
 def unificar_fuentes(
     df_clientes: pd.DataFrame,
     df_productos: pd.DataFrame,
@@ -115,10 +159,13 @@ def unificar_fuentes(
     # ------------------------------------------------------------------
     # Paso 1: Concatenar ventas 2025 y 2026
     # ------------------------------------------------------------------
-    df_ventas = pd.concat(
-        [df_ventas_2025, df_ventas_2026],
-        ignore_index=True,
-    )
+    with etapa("unificacion.concat_ventas",
+               filas_entrada=len(df_ventas_2025) + len(df_ventas_2026)) as m:
+        df_ventas = pd.concat(
+            _alinear_categorias([df_ventas_2025, df_ventas_2026]),
+            ignore_index=True,
+        )
+        m.filas_salida = len(df_ventas)
     print(f"\n  [Paso 1] Ventas 2025 + 2026 concatenadas")
     print(f"           {len(df_ventas_2025)} + {len(df_ventas_2026)} = {len(df_ventas)} registros")
 
@@ -128,16 +175,20 @@ def unificar_fuentes(
     #   - Normalizar columna "genero" (M/Masculino → Masculino,  F/Femenino → Femenino)
     #   - Renombrar columnas que colisionan con ventas
     # ------------------------------------------------------------------
-    df_cli = df_clientes.drop_duplicates(subset=["cliente_id"], keep="first").copy()
+    with etapa("unificacion.preparar_clientes", filas_entrada=len(df_clientes)) as m:
+        df_cli = df_clientes.drop_duplicates(subset=["cliente_id"], keep="first").copy()
 
-    df_cli["genero"] = df_cli["genero"].replace({
-        "M": "Masculino",
-        "F": "Femenino",
-    })
+        # Tabla de dimensión pequeña: se normaliza como texto y se
+        # vuelve a codificar, fusionando "M"/"Masculino" en una categoría.
+        df_cli["genero"] = df_cli["genero"].astype(object).replace({
+            "M": "Masculino",
+            "F": "Femenino",
+        }).astype("category")
 
-    df_cli = df_cli.rename(columns={
-        "activo": "cliente_activo",
-    })
+        df_cli = df_cli.rename(columns={
+            "activo": "cliente_activo",
+        })
+        m.filas_salida = len(df_cli)
 
     duplicados_eliminados = len(df_clientes) - len(df_cli)
     print(f"\n  [Paso 2] Clientes preparados")
@@ -149,13 +200,15 @@ def unificar_fuentes(
     #   LEFT JOIN para conservar todas las ventas aunque un cliente_id
     #   no exista en el catálogo de clientes (integridad referencial débil).
     # ------------------------------------------------------------------
-    df = pd.merge(
-        df_ventas,
-        df_cli,
-        on="cliente_id",
-        how="left",
-        validate="m:1",          # muchas ventas → un cliente
-    )
+    with etapa("unificacion.join_clientes", filas_entrada=len(df_ventas)) as m:
+        df = pd.merge(
+            df_ventas,
+            df_cli,
+            on="cliente_id",
+            how="left",
+            validate="m:1",          # muchas ventas → un cliente
+        )
+        m.filas_salida = len(df)
     sin_cliente = df["nombre"].isna().sum()
     print(f"\n  [Paso 3] JOIN ventas ←→ clientes")
     print(f"           Ventas sin cliente en catálogo : {sin_cliente}")
@@ -163,13 +216,15 @@ def unificar_fuentes(
     # ------------------------------------------------------------------
     # Paso 4: JOIN resultado ←→ productos  (left join)
     # ------------------------------------------------------------------
-    df = pd.merge(
-        df,
-        df_productos.rename(columns={"nombre_producto": "producto"}),
-        on="producto_id",
-        how="left",
-        validate="m:1",
-    )
+    with etapa("unificacion.join_productos", filas_entrada=len(df)) as m:
+        df = pd.merge(
+            df,
+            df_productos.rename(columns={"nombre_producto": "producto"}),
+            on="producto_id",
+            how="left",
+            validate="m:1",
+        )
+        m.filas_salida = len(df)
     sin_producto = df["producto"].isna().sum()
     print(f"\n  [Paso 4] JOIN ←→ productos")
     print(f"           Ventas sin producto en catálogo : {sin_producto}")
@@ -177,13 +232,15 @@ def unificar_fuentes(
     # ------------------------------------------------------------------
     # Paso 5: JOIN resultado ←→ categorias  (left join)
     # ------------------------------------------------------------------
-    df = pd.merge(
-        df,
-        df_categorias,
-        on="categoria_id",
-        how="left",
-        validate="m:1",
-    )
+    with etapa("unificacion.join_categorias", filas_entrada=len(df)) as m:
+        df = pd.merge(
+            df,
+            df_categorias,
+            on="categoria_id",
+            how="left",
+            validate="m:1",
+        )
+        m.filas_salida = len(df)
     sin_categoria = df["nombre_categoria"].isna().sum()
     print(f"\n  [Paso 5] JOIN ←→ categorías")
     print(f"           Ventas sin categoría en catálogo : {sin_categoria}")
@@ -209,6 +266,7 @@ def unificar_fuentes(
 
     print(f"\n  {'─' * 40}")
     print(f"  DataFrame consolidado: {df.shape[0]} filas × {df.shape[1]} columnas")
+    print(f"  Memoria en uso       : {df.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB")
     print(f"  {'─' * 40}")
 
     return df
@@ -218,20 +276,63 @@ def unificar_fuentes(
 # 3. GUARDAR DATAFRAME CONSOLIDADO
 # ===========================================================================
 
-def guardar_consolidado(df: pd.DataFrame, nombre: str = "df_consolidado.csv") -> str:
+def guardar_consolidado(
+    df: pd.DataFrame,
+    nombre: str = None,
+    formato: str = "csv",
+) -> str:
     """
     Guarda el DataFrame consolidado en data/.
 
+    Parámetros
+    ----------
+    df      : pd.DataFrame – DataFrame consolidado.
+    nombre  : str          – Nombre del archivo de salida. Por defecto
+                             df_consolidado.<csv|parquet> o ventas_consolidado.db.
+    formato : str          – "csv", "sqlite" (tabla indexada con las columnas
+                             categóricas como dimensión + códigos, sin
+                             dependencias extra; ver almacen_sqlite.py) o
+                             "parquet" (columnas de diccionario, requiere
+                             pyarrow).
+
     Retorna
     -------
     str  – Ruta absoluta del archivo guardado.
     """
+    # pyarrow no es dependencia del proyecto: se verifica antes de empezar
+    # para no fallar a mitad de la etapa con un error de pandas poco claro.
+    if formato == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(
+            "formato='parquet' requiere pyarrow (pip install pyarrow); "
+            "use formato='csv' o formato='sqlite'"
+        )
+
     print(f"\n{SEPARADOR_DOBLE}")
     print("  3. Guardando DataFrame consolidado...")
     print(SEPARADOR_DOBLE)
 
+    if formato == "sqlite":
+        with etapa("escritura.sqlite", filas_entrada=len(df)):
+            return guardar_sqlite(df, nombre or NOMBRE_DB)
+    if formato == "parquet":
+        nombre = nombre or "df_consolidado.parquet"
+        ruta = os.path.join(DIR_DATA, nombre)
+        with etapa(f"escritura.{nombre}", filas_entrada=len(df)):
+            # pyarrow escribe cada "category" como columna de diccionario:
+            # cada string distinto se serializa una sola vez por bloque.
+            df.to_parquet(ruta, index=False, engine="pyarrow")
+        print(f"\n  ✔  {nombre}  →  {ruta}")
+        print(f"     {df.shape[0]} filas × {df.shape[1]} columnas guardadas")
+        return ruta
+    if formato != "csv":
+        raise ValueError(
+            f"Formato no soportado: {formato!r} (use 'csv', 'parquet' o 'sqlite')"
+        )
+
+    nombre = nombre or "df_consolidado.csv"
     ruta = os.path.join(DIR_DATA, nombre)
-    df.to_csv(ruta, index=False, encoding="utf-8")
+    with etapa(f"escritura.{nombre}", filas_entrada=len(df)):
+        df.to_csv(ruta, index=False, encoding="utf-8")
     print(f"\n  ✔  {nombre}  →  {ruta}")
     print(f"     {df.shape[0]} filas × {df.shape[1]} columnas guardadas")
     return ruta
@@ -250,18 +351,22 @@ def obtener_datos() -> pd.DataFrame:
     pd.DataFrame consolidado
     """
     # 1. Cargar
-    df_clientes, df_productos, df_categorias, df_ventas_2025, df_ventas_2026 = (
-        cargar_fuentes()
-    )
+    with etapa("lectura"):
+        df_clientes, df_productos, df_categorias, df_ventas_2025, df_ventas_2026 = (
+            cargar_fuentes()
+        )
 
     # 2. Unificar
-    df_consolidado = unificar_fuentes(
-        df_clientes, df_productos, df_categorias,
-        df_ventas_2025, df_ventas_2026,
-    )
+    with etapa("unificacion") as m:
+        df_consolidado = unificar_fuentes(
+            df_clientes, df_productos, df_categorias,
+            df_ventas_2025, df_ventas_2026,
+        )
+        m.filas_salida = len(df_consolidado)
 
     # 3. Guardar
-    guardar_consolidado(df_consolidado)
+    with etapa("escritura", filas_entrada=len(df_consolidado)):
+        guardar_consolidado(df_consolidado)
 
     return df_consolidado
 
@@ -0,0 +1,262 @@
+"""
+almacen_sqlite.py
+-----------------
+1. Guarda el DataFrame consolidado en una base SQLite local (inserciones por lotes).
+2. Crea índices sobre cliente_id, fecha_venta, producto_id y venta_id.
+3. Expone una API de consulta puntual y por rangos sobre la tabla indexada.
+
+Las columnas "category" se guardan codificadas por diccionario: una tabla
+de dimensión dim_<columna>(codigo, valor) con cada valor distinto una sola
+vez y, en la tabla de ventas, sólo el código entero. La vista
+ventas_consolidado reúne ambas y devuelve los textos, así que las consultas
+(y cualquier lector de la base) ven las mismas columnas que el DataFrame.
+
+Estructura de directorios esperada:
+    raiz/
+    ├── main.py
+    ├── src/
+    │   ├── L3_obtencion_datos.py
+    │   └── almacen_sqlite.py        ← este archivo
+    └── data/
+        └── ventas_consolidado.db    ← resultado
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Rutas
+# ---------------------------------------------------------------------------
+_DIR_SRC  = os.path.dirname(os.path.abspath(__file__))
+_DIR_ROOT = os.path.dirname(_DIR_SRC)
+DIR_DATA  = os.path.join(_DIR_ROOT, "data")
+
+NOMBRE_DB = "ventas_consolidado.db"
+TABLA     = "ventas_consolidado"            # vista con los textos decodificados
+TABLA_CODIGOS = "ventas_consolidado_codigos"
+PREFIJO_DIMENSION = "dim_"
+TAMANO_LOTE = 50_000
+
+# Columnas indexadas: (nombre del índice, columna)
+INDICES = [
+    ("idx_venta_id",    "venta_id"),
+    ("idx_cliente_id",  "cliente_id"),
+    ("idx_fecha_venta", "fecha_venta"),
+    ("idx_producto_id", "producto_id"),
+]
+
+# Columnas que se guardan como texto ISO (YYYY-MM-DD) para que los
+# rangos de fechas se comparen lexicográficamente usando el índice.
+COLUMNAS_FECHA = ["fecha_venta", "fecha_registro"]
+
+
+# ===========================================================================
+# 1. ESCRITURA
+# ===========================================================================
+
+def _tipo_sqlite(serie: pd.Series) -> str:
+    """Traduce el dtype de una columna de pandas a su afinidad SQLite."""
+    if pd.api.types.is_bool_dtype(serie):
+        return "INTEGER"
+    if pd.api.types.is_integer_dtype(serie):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(serie):
+        return "REAL"
+    return "TEXT"
+
+
+def _es_categorica(serie: pd.Series) -> bool:
+    return isinstance(serie.dtype, pd.CategoricalDtype)
+
+
+def _preparar_filas(df: pd.DataFrame):
+    """
+    Convierte el DataFrame en tuplas de tipos nativos de Python,
+    con las fechas en formato ISO, las columnas "category" como su
+    código entero y NaN/NaT → None.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if _es_categorica(df[col]):
+            codigos = df[col].cat.codes
+            df[col] = codigos.astype("Int64").mask(codigos < 0)
+    for col in COLUMNAS_FECHA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce").dt.strftime("%Y-%m-%d")
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+
+def guardar_sqlite(
+    df: pd.DataFrame,
+    nombre: str = NOMBRE_DB,
+    tamano_lote: int = TAMANO_LOTE,
+) -> str:
+    """
+    Escribe el DataFrame consolidado en una base SQLite dentro de data/.
+
+    La tabla se recrea en cada llamada y se llena con executemany() en
+    lotes de `tamano_lote` filas dentro de una única transacción. Los
+    índices se crean al final, después de la carga masiva. Cada columna
+    "category" se escribe como tabla de dimensión + códigos enteros.
+
+    Parámetros
+    ----------
+    df          : pd.DataFrame – DataFrame consolidado.
+    nombre      : str          – Nombre del archivo .db.
+    tamano_lote : int          – Filas por lote de inserción.
+
+    Retorna
+    -------
+    str  – Ruta absoluta de la base de datos.
+    """
+    ruta = os.path.join(DIR_DATA, nombre)
+
+    columnas = list(df.columns)
+    categoricas = [c for c in columnas if _es_categorica(df[c])]
+    definicion = ", ".join(
+        f'"{c}" {"INTEGER" if c in categoricas else _tipo_sqlite(df[c])}' for c in columnas
+    )
+    marcadores = ", ".join("?" for _ in columnas)
+    insert_sql = f'INSERT INTO {TABLA_CODIGOS} VALUES ({marcadores})'
+
+    with sqlite3.connect(ruta) as con:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        # Objetos de una escritura anterior (incluida una tabla sin codificar)
+        existentes = con.execute(
+            "SELECT type, name FROM sqlite_master WHERE type IN ('view', 'table')"
+            " ORDER BY type DESC"
+        ).fetchall()
+        for tipo, objeto in existentes:
+            if objeto in (TABLA, TABLA_CODIGOS) or objeto.startswith(PREFIJO_DIMENSION):
+                con.execute(f'DROP {tipo.upper()} "{objeto}"')
+        con.execute(f"CREATE TABLE {TABLA_CODIGOS} ({definicion})")
+
+        for col in categoricas:
+            dimension = f"{PREFIJO_DIMENSION}{col}"
+            con.execute(f'CREATE TABLE "{dimension}" (codigo INTEGER PRIMARY KEY, valor)')
+            con.executemany(f'INSERT INTO "{dimension}" VALUES (?, ?)',
+                            enumerate(df[col].cat.categories.tolist()))
+
+        for inicio in range(0, len(df), tamano_lote):
+            lote = df.iloc[inicio:inicio + tamano_lote]
+            con.executemany(insert_sql, _preparar_filas(lote))
+
+        for nombre_idx, columna in INDICES:
+            if columna in columnas:
+                con.execute(f'CREATE INDEX {nombre_idx} ON {TABLA_CODIGOS} ("{columna}")')
+
+        # Vista con las columnas en el orden original y los textos decodificados
+        seleccion = ", ".join(
+            f'd{k}.valor AS "{c}"' if c in categoricas else f't."{c}"'
+            for k, c in enumerate(columnas)
+        )
+        uniones = " ".join(
+            f'LEFT JOIN "{PREFIJO_DIMENSION}{c}" d{k} ON d{k}.codigo = t."{c}"'
+            for k, c in enumerate(columnas) if c in categoricas
+        )
+        con.execute(f"CREATE VIEW {TABLA} AS SELECT {seleccion} FROM {TABLA_CODIGOS} t {uniones}")
+        con.execute("ANALYZE")
+    con.close()
+
+    print(f"\n  ✔  {nombre}  →  {ruta}")
+    print(f"     {df.shape[0]} filas × {df.shape[1]} columnas guardadas "
+          f"(índices: {', '.join(c for _, c in INDICES if c in columnas)}; "
+          f"{len(categoricas)} columnas codificadas)")
+    return ruta
+
+
+# ===========================================================================
+# 2. CONSULTAS
+# ===========================================================================
+
+class AlmacenVentas:
+    """
+    API de consulta sobre la tabla consolidada en SQLite.
+
+    Todas las consultas filtran por columnas indexadas, por lo que se
+    resuelven con búsquedas en el índice en lugar de recorrer la tabla.
+
+    Uso
+    ---
+    >>> with AlmacenVentas() as almacen:
+    ...     almacen.ventas_por_cliente(42)
+    ...     almacen.ventas_entre_fechas("2025-03-01", "2025-03-31")
+    """
+
+    def __init__(self, nombre: str = NOMBRE_DB):
+        self.ruta = os.path.join(DIR_DATA, nombre)
+        if not os.path.exists(self.ruta):
+            raise FileNotFoundError(
+                f"No existe la base {self.ruta}. Ejecute guardar_sqlite() primero."
+            )
+        self._con = sqlite3.connect(f"file:{self.ruta}?mode=ro", uri=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        """Cierra la conexión con la base de datos."""
+        self._con.close()
+
+    def _consultar(self, where: str, params: tuple) -> pd.DataFrame:
+        sql = f"SELECT * FROM {TABLA} WHERE {where}"
+        return pd.read_sql_query(sql, self._con, params=params,
+                                 parse_dates=COLUMNAS_FECHA)
+
+    def venta(self, venta_id: str) -> pd.DataFrame:
+        """Retorna la venta con el venta_id indicado (0 o 1 fila)."""
+        return self._consultar("venta_id = ?", (venta_id,))
+
+    def ventas_por_cliente(self, cliente_id: int) -> pd.DataFrame:
+        """Retorna todas las ventas de un cliente."""
+        return self._consultar("cliente_id = ?", (int(cliente_id),))
+
+    def ventas_por_producto(self, producto_id: int) -> pd.DataFrame:
+        """Retorna todas las ventas de un producto."""
+        return self._consultar("producto_id = ?", (int(producto_id),))
+
+    def ventas_entre_fechas(self, desde, hasta) -> pd.DataFrame:
+        """
+        Retorna las ventas con fecha_venta dentro de [desde, hasta] (ambos incluidos).
+
+        Parámetros
+        ----------
+        desde, hasta : str | date | pd.Timestamp – Límites del rango.
+        """
+        desde = pd.Timestamp(desde).strftime("%Y-%m-%d")
+        hasta = pd.Timestamp(hasta).strftime("%Y-%m-%d")
+        return self._consultar("fecha_venta BETWEEN ? AND ?", (desde, hasta))
+
+    def ventas_por_cliente_entre_fechas(self, cliente_id: int, desde, hasta) -> pd.DataFrame:
+        """Retorna las ventas de un cliente dentro de un rango de fechas."""
+        desde = pd.Timestamp(desde).strftime("%Y-%m-%d")
+        hasta = pd.Timestamp(hasta).strftime("%Y-%m-%d")
+        return self._consultar(
+            "cliente_id = ? AND fecha_venta BETWEEN ? AND ?",
+            (int(cliente_id), desde, hasta),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Punto de entrada directo  (python src/almacen_sqlite.py)
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    df = pd.read_csv(os.path.join(DIR_DATA, "df_consolidado.csv"),
+                     parse_dates=COLUMNAS_FECHA, encoding="utf-8")
+    # Textos repetidos → "category" (codificados en la base); venta_id es único
+    for col in df.select_dtypes(["object", "string"]).columns.drop("venta_id", errors="ignore"):
+        df[col] = df[col].astype("category")
+    guardar_sqlite(df)
+
+    with AlmacenVentas() as almacen:
+        print(f"\n  Ventas del cliente 42:")
+        print(almacen.ventas_por_cliente(42).to_string(index=False))
+        print(f"\n  Ventas entre 2025-03-01 y 2025-03-07:")
+        print(almacen.ventas_entre_fechas("2025-03-01", "2025-03-07").to_string(index=False))
@@ -0,0 +1,331 @@
+"""
+analisis_clientes.py
+--------------------
+Analítica a nivel de cliente sobre el DataFrame consolidado (salida de
+obtener_datos() o df_consolidado.csv):
+  1. Totales de vida del cliente (monto, compras, ticket promedio).
+  2. Puntajes RFM (Recencia, Frecuencia, Monto).
+  3. Matriz de retención por cohorte de registro (fecha_registro vs fecha_venta).
+
+Todas las reducciones son vectorizadas y basadas en ordenamiento: las
+ventas se ordenan por cliente_id una vez y cada agregado se obtiene con
+np.*.reduceat sobre los límites de cada grupo, sin bucles por cliente.
+
+Los datos pueden entregarse como un único DataFrame o como un iterable de
+bloques (p. ej. pd.read_csv(..., chunksize=N)). Cada bloque se reduce a un
+parcial por cliente y los parciales se combinan al final, de modo que la
+memoria crece con la cantidad de clientes y no con la de ventas.
+
+Estructura de directorios esperada:
+    raiz/
+    ├── main.py
+    ├── src/
+    │   ├── L3_obtencion_datos.py
+    │   └── analisis_clientes.py     ← este archivo
+    └── data/
+        └── df_consolidado.csv
+"""
+
+import os
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Rutas
+# ---------------------------------------------------------------------------
+_DIR_SRC  = os.path.dirname(os.path.abspath(__file__))
+_DIR_ROOT = os.path.dirname(_DIR_SRC)
+DIR_DATA  = os.path.join(_DIR_ROOT, "data")
+
+SEPARADOR_DOBLE = "=" * 60
+
+COLUMNAS_NECESARIAS = ["cliente_id", "fecha_venta", "fecha_registro", "total_venta"]
+
+
+# ===========================================================================
+# 1. LECTURA POR BLOQUES
+# ===========================================================================
+
+def leer_consolidado_por_bloques(
+    nombre: str = "df_consolidado.csv",
+    tamano_bloque: int = 1_000_000,
+):
+    """
+    Lee el consolidado en bloques de `tamano_bloque` filas, cargando sólo
+    las columnas necesarias para la analítica de clientes.
+
+    Retorna
+    -------
+    Iterador de pd.DataFrame
+    """
+    ruta = os.path.join(DIR_DATA, nombre)
+    return pd.read_csv(
+        ruta,
+        usecols=COLUMNAS_NECESARIAS,
+        parse_dates=["fecha_venta", "fecha_registro"],
+        chunksize=tamano_bloque,
+        encoding="utf-8",
+    )
+
+
+def _como_bloques(datos) -> Iterable:
+    """Normaliza la entrada: un DataFrame se trata como un único bloque."""
+    if isinstance(datos, pd.DataFrame):
+        return (datos,)
+    return datos
+
+
+def _bloque_vacio() -> pd.DataFrame:
+    """Bloque sin ventas, con las columnas necesarias (iterador sin bloques)."""
+    return pd.DataFrame(columns=COLUMNAS_NECESARIAS)
+
+
+def _a_dias(serie: pd.Series) -> np.ndarray:
+    """Convierte una columna de fechas en días desde 1970-01-01 (int64, NaT → mínimo int64)."""
+    return pd.to_datetime(serie).to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def _a_mes(dias: np.ndarray) -> np.ndarray:
+    """Convierte días desde la época en meses desde 1970-01 (int64)."""
+    return dias.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _limites_grupo(claves_ordenadas: np.ndarray) -> np.ndarray:
+    """Índices de inicio de cada grupo en un arreglo de claves ya ordenado."""
+    if len(claves_ordenadas) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, claves_ordenadas[1:] != claves_ordenadas[:-1]])
+
+
+# ===========================================================================
+# 2. REDUCCIÓN POR CLIENTE (PARCIALES COMBINABLES)
+# ===========================================================================
+
+def _parcial_clientes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce un bloque de ventas a una fila por cliente:
+    primera/última compra (días), n.º de compras, monto total y fecha de registro.
+    """
+    df = df.dropna(subset=["cliente_id", "fecha_venta"])
+    cliente = df["cliente_id"].to_numpy(dtype=np.int64)
+    fecha = _a_dias(df["fecha_venta"])
+    registro = _a_dias(df["fecha_registro"])
+    monto = df["total_venta"].to_numpy(dtype=np.float64)
+
+    orden = np.argsort(cliente, kind="stable")
+    cliente, fecha, registro, monto = cliente[orden], fecha[orden], registro[orden], monto[orden]
+    inicios = _limites_grupo(cliente)
+
+    return pd.DataFrame({
+        "cliente_id":     cliente[inicios],
+        "primera_compra": np.minimum.reduceat(fecha, inicios),
+        "ultima_compra":  np.maximum.reduceat(fecha, inicios),
+        "frecuencia":     np.diff(np.r_[inicios, len(cliente)]),
+        "monto":          np.add.reduceat(monto, inicios),
+        "fecha_registro": np.maximum.reduceat(registro, inicios),
+    })
+
+
+def _combinar_parciales(parciales: list) -> pd.DataFrame:
+    """Combina los parciales de varios bloques en una única fila por cliente."""
+    if not parciales:
+        # Iterador sin bloques: parcial vacío con las columnas y tipos esperados
+        return _parcial_clientes(_bloque_vacio())
+    if len(parciales) == 1:
+        return parciales[0]
+    df = pd.concat(parciales, ignore_index=True)
+    return df.groupby("cliente_id", sort=True).agg(
+        primera_compra=("primera_compra", "min"),
+        ultima_compra=("ultima_compra", "max"),
+        frecuencia=("frecuencia", "sum"),
+        monto=("monto", "sum"),
+        fecha_registro=("fecha_registro", "max"),
+    ).reset_index()
+
+
+def _agregar_clientes(datos) -> pd.DataFrame:
+    return _combinar_parciales([_parcial_clientes(b) for b in _como_bloques(datos)])
+
+
+# ===========================================================================
+# 3. TOTALES DE VIDA DEL CLIENTE
+# ===========================================================================
+
+def totales_cliente(datos) -> pd.DataFrame:
+    """
+    Calcula los totales de vida de cada cliente.
+
+    Parámetros
+    ----------
+    datos : pd.DataFrame | iterable de pd.DataFrame – Ventas consolidadas.
+
+    Retorna
+    -------
+    pd.DataFrame indexado por cliente_id con: primera_compra, ultima_compra,
+    n_compras, monto_total, ticket_promedio, dias_como_cliente.
+    """
+    agg = _agregar_clientes(datos)
+    registro = agg["fecha_registro"].to_numpy()
+    registro_valido = registro != np.iinfo(np.int64).min
+    return pd.DataFrame({
+        "primera_compra":    agg["primera_compra"].to_numpy().astype("datetime64[D]"),
+        "ultima_compra":     agg["ultima_compra"].to_numpy().astype("datetime64[D]"),
+        "n_compras":         agg["frecuencia"].to_numpy(),
+        "monto_total":       agg["monto"].to_numpy(),
+        "ticket_promedio":   agg["monto"].to_numpy() / agg["frecuencia"].to_numpy(),
+        "dias_como_cliente": np.where(
+            registro_valido, agg["ultima_compra"].to_numpy() - registro, np.nan
+        ),
+    }, index=pd.Index(agg["cliente_id"].to_numpy(), name="cliente_id"))
+
+
+# ===========================================================================
+# 4. RFM
+# ===========================================================================
+
+def _puntaje_cuantil(valores: np.ndarray, n_segmentos: int, ascendente: bool = True) -> np.ndarray:
+    """
+    Asigna puntajes 1..n_segmentos por cuantiles de rango (empates resueltos
+    por orden), de forma que cada segmento tenga aprox. el mismo tamaño.
+    """
+    rango = pd.Series(valores).rank(method="first").to_numpy()
+    puntaje = np.ceil(rango * n_segmentos / len(valores)).astype(np.int64)
+    return puntaje if ascendente else n_segmentos + 1 - puntaje
+
+
+def calcular_rfm(datos, fecha_referencia=None, n_segmentos: int = 5) -> pd.DataFrame:
+    """
+    Calcula Recencia, Frecuencia y Monto por cliente y sus puntajes.
+
+    Parámetros
+    ----------
+    datos            : pd.DataFrame | iterable de pd.DataFrame – Ventas consolidadas.
+    fecha_referencia : fecha desde la que se mide la recencia. Por defecto,
+                       el día siguiente a la última venta del dataset.
+    n_segmentos      : int – Número de niveles de cada puntaje (5 → 1..5).
+
+    Retorna
+    -------
+    pd.DataFrame indexado por cliente_id con: recencia_dias, frecuencia,
+    monto, R, F, M, puntaje_rfm (suma) y segmento_rfm ("R-F-M" como texto).
+    """
+    agg = _agregar_clientes(datos)
+    if agg.empty:
+        return pd.DataFrame(columns=["recencia_dias", "frecuencia", "monto",
+                                     "R", "F", "M", "puntaje_rfm", "segmento_rfm"])
+
+    ultima = agg["ultima_compra"].to_numpy()
+    if fecha_referencia is None:
+        referencia = ultima.max() + 1
+    else:
+        referencia = np.datetime64(pd.Timestamp(fecha_referencia).date(), "D").astype(np.int64)
+
+    recencia = referencia - ultima
+    frecuencia = agg["frecuencia"].to_numpy()
+    monto = agg["monto"].to_numpy()
+
+    # Menor recencia = mejor → puntaje descendente
+    r = _puntaje_cuantil(recencia, n_segmentos, ascendente=False)
+    f = _puntaje_cuantil(frecuencia, n_segmentos)
+    m = _puntaje_cuantil(monto, n_segmentos)
+
+    return pd.DataFrame({
+        "recencia_dias": recencia,
+        "frecuencia":    frecuencia,
+        "monto":         monto,
+        "R": r,
+        "F": f,
+        "M": m,
+        "puntaje_rfm":   r + f + m,
+        "segmento_rfm":  (pd.Series(r).astype(str) + "-" + pd.Series(f).astype(str)
+                          + "-" + pd.Series(m).astype(str)).to_numpy(),
+    }, index=pd.Index(agg["cliente_id"].to_numpy(), name="cliente_id"))
+
+
+# ===========================================================================
+# 5. COHORTES DE REGISTRO
+# ===========================================================================
+
+def _parcial_cohortes(df: pd.DataFrame) -> pd.DataFrame:
+    """Pares únicos (cliente, mes de registro, meses desde el registro) de un bloque."""
+    df = df.dropna(subset=["cliente_id", "fecha_venta", "fecha_registro"])
+    mes_registro = _a_mes(_a_dias(df["fecha_registro"]))
+    mes_venta = _a_mes(_a_dias(df["fecha_venta"]))
+    pares = pd.DataFrame({
+        "cliente_id": df["cliente_id"].to_numpy(dtype=np.int64),
+        "cohorte": mes_registro,
+        "periodo": mes_venta - mes_registro,
+    })
+    return pares.drop_duplicates()
+
+
+def matriz_cohortes(datos, proporcion: bool = True) -> pd.DataFrame:
+    """
+    Construye la matriz de retención por cohorte de registro.
+
+    Filas = mes de fecha_registro (cohorte); columnas = meses transcurridos
+    desde el registro; valores = clientes distintos de la cohorte que
+    compraron ese mes (o proporción sobre el tamaño de la cohorte).
+
+    El tamaño de la cohorte es el número de clientes de ese mes de registro
+    presentes en las ventas.
+
+    Parámetros
+    ----------
+    datos      : pd.DataFrame | iterable de pd.DataFrame – Ventas consolidadas.
+    proporcion : bool – True → fracción retenida; False → conteo de clientes.
+
+    Retorna
+    -------
+    pd.DataFrame (cohorte × periodo)
+    """
+    parciales = [_parcial_cohortes(b) for b in _como_bloques(datos)]
+    pares = pd.concat(parciales or [_parcial_cohortes(_bloque_vacio())],
+                      ignore_index=True).drop_duplicates()
+    if pares.empty:
+        return pd.DataFrame()
+
+    # Conteo de clientes distintos por (cohorte, periodo) con un único
+    # código entero y np.bincount sobre él.
+    cohortes, cod_cohorte = np.unique(pares["cohorte"].to_numpy(), return_inverse=True)
+    periodos, cod_periodo = np.unique(pares["periodo"].to_numpy(), return_inverse=True)
+    conteos = np.bincount(cod_cohorte * len(periodos) + cod_periodo,
+                          minlength=len(cohortes) * len(periodos))
+    conteos = conteos.reshape(len(cohortes), len(periodos))
+
+    cohortes_idx = pd.PeriodIndex(cohortes.astype("datetime64[M]"), freq="M", name="cohorte")
+    matriz = pd.DataFrame(conteos, index=cohortes_idx,
+                          columns=pd.Index(periodos, name="meses_desde_registro"))
+
+    if proporcion:
+        tamano = (pares.drop_duplicates(["cliente_id", "cohorte"])
+                       .groupby("cohorte").size()
+                       .reindex(cohortes).to_numpy())
+        matriz = matriz.div(tamano, axis=0)
+
+    return matriz
+
+
+# ---------------------------------------------------------------------------
+# Punto de entrada directo  (python src/analisis_clientes.py)
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    rfm = calcular_rfm(leer_consolidado_por_bloques())
+    print(f"\n{SEPARADOR_DOBLE}")
+    print("  RFM por cliente (mejores 10)")
+    print(SEPARADOR_DOBLE)
+    print(rfm.sort_values("puntaje_rfm", ascending=False).head(10).to_string())
+
+    totales = totales_cliente(leer_consolidado_por_bloques())
+    print(f"\n{SEPARADOR_DOBLE}")
+    print("  Totales de vida (mayor monto)")
+    print(SEPARADOR_DOBLE)
+    print(totales.sort_values("monto_total", ascending=False).head(10).to_string())
+
+    cohortes = matriz_cohortes(leer_consolidado_por_bloques())
+    print(f"\n{SEPARADOR_DOBLE}")
+    print("  Retención por cohorte de registro (primeras columnas)")
+    print(SEPARADOR_DOBLE)
+    print(cohortes.iloc[:, :8].round(2).to_string())
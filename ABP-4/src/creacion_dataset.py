@@ -22,6 +22,11 @@ from datetime import date, timedelta
 import numpy as np
 import pandas as pd
 
+try:
+    from src.instrumentacion import etapa
+except ModuleNotFoundError:                 # ejecución directa desde src/
+    from instrumentacion import etapa
+
 # ---------------------------------------------------------------------------
 # Rutas
 # ---------------------------------------------------------------------------
@@ -222,19 +227,28 @@ def crear_dataset() -> None:
     os.makedirs(DIR_DATA, exist_ok=True)
 
     # -- Clientes --
-    df_clientes = generar_clientes(n_clientes=300)
+    with etapa("generacion.clientes") as m:
+        df_clientes = generar_clientes(n_clientes=300)
+        m.filas_salida = len(df_clientes)
     ruta_clientes = os.path.join(DIR_DATA, "clientes_ecommerce.csv")
-    df_clientes.to_csv(ruta_clientes, index=False)
+    with etapa("escritura.clientes_ecommerce.csv", filas_entrada=len(df_clientes)):
+        df_clientes.to_csv(ruta_clientes, index=False)
     print(f"✔  Clientes generados  →  {ruta_clientes}")
 
     # -- Ventas 2025 y 2026 --
-    df_2025, df_categorias, df_productos = generar_ventas(2025, 1_000)
-    df_2026, _, _                        = generar_ventas(2026, 300)
+    with etapa("generacion.ventas_2025") as m:
+        df_2025, df_categorias, df_productos = generar_ventas(2025, 1_000)
+        m.filas_salida = len(df_2025)
+    with etapa("generacion.ventas_2026") as m:
+        df_2026, _, _                        = generar_ventas(2026, 300)
+        m.filas_salida = len(df_2026)
 
     ruta_excel = os.path.join(DIR_DATA, "ventas_ecommerce_2025_2026.xlsx")
-    with pd.ExcelWriter(ruta_excel, engine="openpyxl") as writer:
-        df_2025.to_excel(writer, sheet_name="ventas_2025", index=False)
-        df_2026.to_excel(writer, sheet_name="ventas_2026", index=False)
+    with etapa("escritura.ventas_ecommerce_2025_2026.xlsx",
+               filas_entrada=len(df_2025) + len(df_2026)):
+        with pd.ExcelWriter(ruta_excel, engine="openpyxl") as writer:
+            df_2025.to_excel(writer, sheet_name="ventas_2025", index=False)
+            df_2026.to_excel(writer, sheet_name="ventas_2026", index=False)
     print(f"✔  Ventas generadas    →  {ruta_excel}")
 
     # -- Categorías y Productos --
@@ -25,6 +25,11 @@ import os
 import numpy as np
 import pandas as pd
 
+try:
+    from src.instrumentacion import etapa
+except ModuleNotFoundError:                 # ejecución directa desde src/
+    from instrumentacion import etapa
+
 # ---------------------------------------------------------------------------
 # Rutas
 # ---------------------------------------------------------------------------
@@ -248,7 +253,8 @@ def guardar_dataframes(dataframes: dict) -> None:
 
     for nombre, df in dataframes.items():
         ruta = os.path.join(DIR_DATA, nombre)
-        df.to_csv(ruta, index=False, encoding="utf-8")
+        with etapa(f"escritura.{nombre}", filas_entrada=len(df)):
+            df.to_csv(ruta, index=False, encoding="utf-8")
         print(f"  ✔  {nombre:<45} ({df.shape[0]} filas × {df.shape[1]} cols)  →  {ruta}")
 
 
@@ -268,10 +274,18 @@ def explorar_datos() -> None:
     print("  1. Leyendo archivos CSV con NumPy...")
     print("=" * 60)
 
-    df_clientes  = leer_con_numpy("clientes_ecommerce.csv")
-    df_productos = leer_con_numpy("productos.csv")
-    df_categorias = leer_con_numpy("categorias.csv")
-    df_ventas_2025, df_ventas_2026 = leer_excel_ventas()
+    with etapa("lectura.clientes_ecommerce.csv") as m:
+        df_clientes  = leer_con_numpy("clientes_ecommerce.csv")
+        m.filas_salida = len(df_clientes)
+    with etapa("lectura.productos.csv") as m:
+        df_productos = leer_con_numpy("productos.csv")
+        m.filas_salida = len(df_productos)
+    with etapa("lectura.categorias.csv") as m:
+        df_categorias = leer_con_numpy("categorias.csv")
+        m.filas_salida = len(df_categorias)
+    with etapa("lectura.ventas_ecommerce.xlsx") as m:
+        df_ventas_2025, df_ventas_2026 = leer_excel_ventas()
+        m.filas_salida = len(df_ventas_2025) + len(df_ventas_2026)
 
     print("  ✔  clientes_ecommerce.csv   →  DataFrame OK")
     print("  ✔  productos.csv            →  DataFrame OK")
@@ -298,11 +312,15 @@ def explorar_datos() -> None:
     print("  2b. Estadísticas descriptivas")
     print("=" * 60)
 
-    mostrar_estadisticas(df_clientes,    "clientes_ecommerce.csv")
-    mostrar_estadisticas(df_productos,   "productos.csv")
-    mostrar_estadisticas(df_categorias,  "categorias.csv")
-    mostrar_estadisticas(df_ventas_2025, "ventas_2025")
-    mostrar_estadisticas(df_ventas_2026, "ventas_2026")
+    for df, nombre in [
+        (df_clientes,    "clientes_ecommerce.csv"),
+        (df_productos,   "productos.csv"),
+        (df_categorias,  "categorias.csv"),
+        (df_ventas_2025, "ventas_2025"),
+        (df_ventas_2026, "ventas_2026"),
+    ]:
+        with etapa(f"estadisticas.{nombre}", filas_entrada=len(df)):
+            mostrar_estadisticas(df, nombre)
 
     # ------------------------------------------------------------------
     # 2c. Filtros condicionales
@@ -311,7 +329,8 @@ def explorar_datos() -> None:
     print("  2c. Filtros condicionales")
     print("=" * 60)
 
-    aplicar_filtros(df_clientes, df_ventas_2025, df_ventas_2026)
+    with etapa("filtros", filas_entrada=len(df_clientes) + len(df_ventas_2025) + len(df_ventas_2026)):
+        aplicar_filtros(df_clientes, df_ventas_2025, df_ventas_2026)
 
     # ------------------------------------------------------------------
     # 3. Guardar DataFrames en CSV
@@ -0,0 +1,243 @@
+"""
+instrumentacion.py
+------------------
+Mide cada etapa del pipeline (generación, lectura, estadísticas, filtros,
+concatenación, joins y escritura) y emite los resultados como JSON.
+
+Por etapa se registra:
+  - tiempo de pared y tiempo de CPU,
+  - RSS máximo del proceso (getrusage),
+  - filas de entrada / salida y filas por segundo,
+  - opcionalmente, el pico de memoria asignada (tracemalloc).
+
+La instrumentación está desactivada por defecto y no tiene costo hasta que
+se activa, ya sea con activar() o con la variable de entorno ABP4_METRICAS:
+
+    ABP4_METRICAS=metricas.json python src/L3_obtencion_datos.py
+
+Con ABP4_PERFIL=<directorio> además se guarda un perfil cProfile (.prof)
+por cada etapa de primer nivel.
+
+tracemalloc intercepta cada asignación y multiplica los tiempos del
+pipeline (~11x al unificar y escribir 260k ventas), así que el pico de
+memoria por etapa es una opción aparte: activar(memoria=True) o
+ABP4_MEMORIA=1. Los tiempos de una corrida con memoria no son comparables
+con los de una corrida sin ella; memoria_pico_mb es null si no se mide.
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:                          # Windows
+    resource = None
+
+
+# ===========================================================================
+# 1. REGISTRO DE UNA ETAPA
+# ===========================================================================
+
+class Medicion:
+    """Resultado de una etapa instrumentada. Se completa al salir del bloque."""
+
+    def __init__(self, nombre: str, padre: str = None, nivel: int = 0,
+                 filas_entrada: int = None):
+        self.nombre = nombre
+        self.padre = padre
+        self.nivel = nivel
+        self.filas_entrada = filas_entrada
+        self.filas_salida = None
+        self.tiempo_pared_s = 0.0
+        self.tiempo_cpu_s = 0.0
+        self.memoria_pico_mb = None
+        self.rss_max_mb = None
+        self._pico_bytes = 0
+        self._mem_inicio = 0
+
+    @property
+    def filas_por_segundo(self):
+        filas = self.filas_salida if self.filas_salida is not None else self.filas_entrada
+        if filas is None or self.tiempo_pared_s <= 0:
+            return None
+        return filas / self.tiempo_pared_s
+
+    def a_dict(self) -> dict:
+        return {
+            "etapa": self.nombre,
+            "padre": self.padre,
+            "nivel": self.nivel,
+            "tiempo_pared_s": round(self.tiempo_pared_s, 6),
+            "tiempo_cpu_s": round(self.tiempo_cpu_s, 6),
+            "memoria_pico_mb": (None if self.memoria_pico_mb is None
+                                else round(self.memoria_pico_mb, 3)),
+            "rss_max_mb": None if self.rss_max_mb is None else round(self.rss_max_mb, 3),
+            "filas_entrada": self.filas_entrada,
+            "filas_salida": self.filas_salida,
+            "filas_por_segundo": (None if self.filas_por_segundo is None
+                                  else round(self.filas_por_segundo, 1)),
+        }
+
+
+class _MedicionNula:
+    """Sustituto sin costo cuando la instrumentación está desactivada."""
+    filas_entrada = None
+    filas_salida = None
+
+
+def _rss_max_mb():
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes.
+    return maximo / (1024 ** 2) if sys.platform == "darwin" else maximo / 1024
+
+
+# ===========================================================================
+# 2. INSTRUMENTADOR
+# ===========================================================================
+
+class Instrumentador:
+    """
+    Acumula las mediciones de las etapas del pipeline.
+
+    Las etapas pueden anidarse (p. ej. "unificacion" → "unificacion.join_clientes");
+    el pico de memoria de una etapa padre (si se mide) incluye el de sus hijas.
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.mediciones = []
+        self.dir_perfiles = None
+        self.memoria = False
+        self._pila = []
+        self._tracemalloc_propio = False
+
+    def activar(self, dir_perfiles: str = None, memoria: bool = False) -> None:
+        """
+        Comienza a registrar etapas. Con dir_perfiles se guarda un .prof por
+        etapa raíz; con memoria=True además se mide el pico de memoria de
+        cada etapa con tracemalloc (los tiempos quedan inflados).
+        """
+        self.activo = True
+        self.dir_perfiles = dir_perfiles
+        self.memoria = memoria
+        if dir_perfiles:
+            os.makedirs(dir_perfiles, exist_ok=True)
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_propio = True
+
+    def desactivar(self) -> None:
+        """Deja de registrar etapas (las mediciones acumuladas se conservan)."""
+        self.activo = False
+        self.memoria = False
+        if self._tracemalloc_propio:
+            tracemalloc.stop()
+            self._tracemalloc_propio = False
+
+    @contextmanager
+    def etapa(self, nombre: str, filas_entrada: int = None):
+        """
+        Context manager que mide el bloque que envuelve.
+
+        Uso
+        ---
+        >>> with etapa("unificacion.concat", filas_entrada=n) as m:
+        ...     df = pd.concat(...)
+        ...     m.filas_salida = len(df)
+        """
+        if not self.activo:
+            yield _MedicionNula()
+            return
+
+        padre = self._pila[-1] if self._pila else None
+        medicion = Medicion(nombre, padre.nombre if padre else None,
+                            len(self._pila), filas_entrada)
+
+        if self.memoria:
+            # El pico acumulado hasta ahora pertenece al padre; se reinicia
+            # para que el pico medido corresponda sólo a esta etapa.
+            actual, pico = tracemalloc.get_traced_memory()
+            if padre is not None:
+                padre._pico_bytes = max(padre._pico_bytes, pico)
+            tracemalloc.reset_peak()
+            medicion._mem_inicio = actual
+
+        perfil = None
+        if self.dir_perfiles and padre is None:
+            perfil = cProfile.Profile()
+
+        self._pila.append(medicion)
+        t_pared = time.perf_counter()
+        t_cpu = time.process_time()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield medicion
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            medicion.tiempo_pared_s = time.perf_counter() - t_pared
+            medicion.tiempo_cpu_s = time.process_time() - t_cpu
+            self._pila.pop()
+
+            if self.memoria:
+                _, pico = tracemalloc.get_traced_memory()
+                medicion._pico_bytes = max(medicion._pico_bytes, pico)
+                medicion.memoria_pico_mb = (medicion._pico_bytes - medicion._mem_inicio) / 1024 ** 2
+                if padre is not None:
+                    padre._pico_bytes = max(padre._pico_bytes, medicion._pico_bytes)
+            medicion.rss_max_mb = _rss_max_mb()
+
+            if perfil is not None:
+                perfil.dump_stats(os.path.join(self.dir_perfiles, f"{nombre}.prof"))
+            self.mediciones.append(medicion)
+
+    def reporte(self) -> dict:
+        """Retorna todas las mediciones como un diccionario serializable."""
+        return {
+            "generado": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "etapas": [m.a_dict() for m in self.mediciones],
+        }
+
+    def exportar_json(self, ruta: str) -> str:
+        """Escribe el reporte JSON en `ruta` y retorna la ruta."""
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.reporte(), f, ensure_ascii=False, indent=2)
+        return ruta
+
+
+# ---------------------------------------------------------------------------
+# Instancia global usada por los módulos del pipeline
+# ---------------------------------------------------------------------------
+INSTRUMENTADOR = Instrumentador()
+etapa = INSTRUMENTADOR.etapa
+
+
+def activar(ruta_json: str = None, dir_perfiles: str = None,
+            memoria: bool = False) -> Instrumentador:
+    """
+    Activa la instrumentación global. Si se indica ruta_json, el reporte
+    se escribe automáticamente al terminar el proceso. memoria=True agrega
+    el pico de memoria por etapa (tracemalloc).
+    """
+    INSTRUMENTADOR.activar(dir_perfiles=dir_perfiles, memoria=memoria)
+    if ruta_json:
+        atexit.register(INSTRUMENTADOR.exportar_json, ruta_json)
+    return INSTRUMENTADOR
+
+
+if os.environ.get("ABP4_METRICAS") or os.environ.get("ABP4_PERFIL"):
+    activar(os.environ.get("ABP4_METRICAS"), os.environ.get("ABP4_PERFIL"),
+            memoria=os.environ.get("ABP4_MEMORIA", "") not in ("", "0"))
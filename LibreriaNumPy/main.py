@@ -1,45 +1,190 @@
-from src.datos import generar_datos
-from src.analisis import (calcular_estadisticas, calcular_variaciones,
-                          realizar_transformaciones, calcular_metricas_finales)
-from src.reportes import *  # Se importan todas las funciones de reporte
-import time
-import numpy as np
+import argparse
+import sys
 
+# Los módulos pesados (numpy, src.*) se importan dentro de cada subcomando:
+# `main.py --help` no carga NumPy y `stats` no carga la proyección GBM, portafolio
+# ni la suite de benchmark. Ver `python main.py benchmark --arranque`.
 
-def main():
+FORMATOS = ('terminal', 'markdown', 'csv', 'html')
+
+
+def _obtener_datos(args):
     # 1. OBTENCIÓN DE DATOS
-    precios, nombres, dias = generar_datos()
+    from src.datos import generar_datos
+
+    return generar_datos(args.acciones, args.dias, args.semilla, args.dtype)
+
+
+def _configurar_cache(args, precios):
+    # Versiones con caché de las funciones de análisis: con la misma matriz y
+    # parámetros el resultado sale de --cache (o NUMPY_CACHE_DIR) sin
+    # recalcular. Sin directorio la caché se desactiva: un proceso nuevo
+    # nunca acierta en memoria y sólo pagaría las huellas.
+    import src.cache
+
+    directorio = args.cache or src.cache.DIRECTORIO_CACHE
+    if not directorio:
+        src.cache.CACHE = None
+        return src.cache, precios
+    src.cache.CACHE = src.cache.CacheResultados(directorio=directorio)
+    # La matriz se hashea una sola vez; las claves de los resultados
+    # derivados salen de esa huella
+    return src.cache, src.cache.congelar(precios)
+
+
+def _momentos(args, cache, matriz):
+    # Con --hilos, las variantes multihilo de src.paralelo (mismo resultado
+    # fila a fila); sin --hilos src.paralelo no se importa
+    if args.hilos is None:
+        return cache.calcular_momentos_cache(matriz)
+    return cache.calcular_momentos_paralelo_cache(matriz, args.hilos or None)
+
+
+def comando_stats(args):
+    precios, nombres, dias = _obtener_datos(args)
+    cache, precios = _configurar_cache(args, precios)
+    momentos = None if args.hilos is None else _momentos(args, cache, precios)
+    promedios, maximos, minimos = cache.calcular_estadisticas_cache(precios, momentos)
+
+    from src import reportes
+
+    if args.salida:
+        from src.render import escribir_tablas
+
+        tabla = reportes.tabla_estadisticas(nombres, promedios, maximos, minimos)
+        escribir_tablas([tabla], args.salida, args.formato)
+        print(f"Estadísticas guardadas en {args.salida}")
+        return 0
+    reportes.imprimir_estadisticas(nombres, promedios, maximos, minimos)
+    return 0
+
+
+def comando_report(args):
+    precios, nombres, dias = _obtener_datos(args)
+    cache, precios = _configurar_cache(args, precios)
+
+    from src.proyeccion_gbm import PERCENTILES, calibrar_gbm
+    from src.portafolio import (matriz_covarianza, pesos_por_posicion,
+                                pesos_minima_varianza, volatilidad_portafolio)
+    from src import reportes
 
     # 2. PROCESAMIENTO (CÁLCULOS)
-    promedios, maximos, minimos = calcular_estadisticas(precios)
-    variaciones = calcular_variaciones(precios)
-    rendimientos, normalizados, proyeccion = realizar_transformaciones(precios)
-    v_ini, v_fin, rend_port, vol, sharpe = calcular_metricas_finales(precios, variaciones)
-
-    # 3. EJECUCIÓN DEL BENCHMARK (Necesario para los tiempos)
-    datos_g = np.random.uniform(50, 150, (1000, 1000))
-    t_ini = time.time()
-    _ = np.mean(datos_g, axis=1)
-    t_numpy = time.time() - t_ini
-
-    t_ini = time.time()
-    for fila in datos_g:
-        _ = sum(fila) / len(fila)
-    t_python = time.time() - t_ini
-
-    # 4. PRESENTACIÓN DE RESULTADOS (REPORTES)
-    imprimir_cabecera()
-    imprimir_matriz_precios(nombres, dias, precios)
-    imprimir_estadisticas(nombres, promedios, maximos, minimos)
-    imprimir_variaciones(nombres, variaciones)
-    imprimir_analisis_avanzado(nombres, dias, normalizados, proyeccion, precios)
-    imprimir_benchmark(t_numpy, t_python)
-    imprimir_resumen_ejecutivo(v_ini, v_fin, rend_port, sharpe, nombres)
+    # Los momentos por fila se calculan una sola vez y se reutilizan
+    momentos = _momentos(args, cache, precios)
+    promedios, maximos, minimos = cache.calcular_estadisticas_cache(precios, momentos)
+    if args.hilos is None:
+        variaciones = cache.calcular_variaciones_cache(precios)
+        rendimientos, normalizados, proyeccion = cache.realizar_transformaciones_cache(
+            precios, momentos=momentos)
+    else:
+        n_hilos = args.hilos or None
+        variaciones = cache.calcular_variaciones_paralelo_cache(precios, n_hilos)
+        rendimientos, normalizados, proyeccion = cache.realizar_transformaciones_paralelo_cache(
+            precios, n_hilos=n_hilos)
+    v_ini, v_fin, rend_port, vol, sharpe = cache.calcular_metricas_finales_cache(
+        precios, variaciones, _momentos(args, cache, variaciones))
+
+    if args.salida:
+        reportes.exportar_reporte(args.salida, args.formato, nombres, dias, precios,
+                                  (promedios, maximos, minimos), variaciones,
+                                  normalizados, vol, sharpe,
+                                  max_filas=args.max_filas, max_columnas=args.max_columnas)
+        print(f"Reporte guardado en {args.salida}")
+        return 0
+
+    covarianza, contraccion = matriz_covarianza(rendimientos, contraccion='ledoit_wolf')
+    pesos_actuales = pesos_por_posicion(precios)
+    pesos_min_var = pesos_minima_varianza(covarianza)
+    bandas = cache.bandas_gbm_cache(precios[:, -1], calibrar_gbm(rendimientos),
+                                    horizonte=proyeccion.shape[1])
+
+    # 3. PRESENTACIÓN DE RESULTADOS (REPORTES)
+    reportes.imprimir_cabecera()
+    reportes.imprimir_matriz_precios(nombres, dias, precios)
+    reportes.imprimir_estadisticas(nombres, promedios, maximos, minimos)
+    reportes.imprimir_variaciones(nombres, variaciones, dias)
+    reportes.imprimir_analisis_avanzado(nombres, dias, normalizados, proyeccion, precios,
+                                        bandas, PERCENTILES)
+
+    # 4. BENCHMARK (sólo si se pide; mediana de varias repeticiones)
+    if args.benchmark:
+        from src.benchmark import comparar_con_python, ejecutar_suite
+
+        reportes.imprimir_benchmark(*comparar_con_python())
+        reportes.imprimir_suite_benchmark(ejecutar_suite(tamanos=[(1000, 1000)], repeticiones=5,
+                                                         n_hilos=args.hilos))
+
+    reportes.imprimir_portafolio(nombres, pesos_actuales, pesos_min_var,
+                                 volatilidad_portafolio(pesos_actuales, covarianza),
+                                 volatilidad_portafolio(pesos_min_var, covarianza), contraccion)
+    reportes.imprimir_resumen_ejecutivo(v_ini, v_fin, rend_port, sharpe, nombres)
 
     print("\n" + "=" * 80)
     print("FIN DEL ANÁLISIS")
     print("=" * 80)
+    return 0
+
+
+def comando_benchmark(opciones):
+    from src.benchmark import main as main_benchmark
+
+    return main_benchmark(opciones)
+
+
+def _hilos(texto):
+    n_hilos = int(texto)
+    if n_hilos < 0:
+        raise argparse.ArgumentTypeError(f'se esperaba un entero >= 0, no {texto!r}')
+    return n_hilos
+
+
+def _agregar_opciones_datos(parser):
+    parser.add_argument('--acciones', type=int, default=5)
+    parser.add_argument('--dias', type=int, default=5)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='directorio de la caché en disco (por defecto NUMPY_CACHE_DIR)')
+    parser.add_argument('--hilos', type=_hilos, metavar='N',
+                        help='repartir el análisis por filas en N hilos (src.paralelo); '
+                             '0 = NUMPY_HILOS o todos los núcleos')
+    parser.add_argument('--formato', choices=FORMATOS, default='terminal',
+                        help='formato del archivo de --salida')
+    parser.add_argument('--salida', metavar='RUTA', help='escribir las tablas en un archivo')
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description='Análisis financiero con NumPy')
+    subparsers = parser.add_subparsers(dest='comando')
+
+    stats = subparsers.add_parser('stats', help='estadísticas por acción')
+    _agregar_opciones_datos(stats)
+    stats.set_defaults(funcion=comando_stats)
+
+    report = subparsers.add_parser('report', help='análisis completo (comando por defecto)')
+    _agregar_opciones_datos(report)
+    report.add_argument('--max-filas', type=int, default=None)
+    report.add_argument('--max-columnas', type=int, default=None)
+    report.add_argument('--benchmark', action='store_true',
+                        help='incluir la comparación NumPy vs. Python y la suite de benchmark')
+    report.set_defaults(funcion=comando_report)
+
+    # Las opciones de `benchmark` son las de src.benchmark (ver main())
+    subparsers.add_parser('benchmark', add_help=False,
+                          help='suite de benchmark (opciones de python -m src.benchmark)')
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['benchmark']:
+        return comando_benchmark(argv[1:])
+    args = crear_parser().parse_args(argv or ['report'])
+    if args.comando is None:
+        crear_parser().print_help()
+        return 2
+    return args.funcion(args)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
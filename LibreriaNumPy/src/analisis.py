@@ -1,42 +1,62 @@
 import numpy as np
 
+from src.momentos import calcular_momentos, dtype_flotante
 
-def calcular_estadisticas(precios_acciones):
-    promedios = np.mean(precios_acciones, axis=1)
-    maximos = np.max(precios_acciones, axis=1)
-    minimos = np.min(precios_acciones, axis=1)
-    return promedios, maximos, minimos
+
+def calcular_estadisticas(precios_acciones, momentos=None):
+    if momentos is None:
+        momentos = calcular_momentos(precios_acciones)
+    return momentos.media, momentos.maximo, momentos.minimo
 
 
 def calcular_variaciones(precios_acciones):
-    variacion_porcentual = np.zeros((5, 4))
-    for i in range(5):
-        for j in range(4):
-            variacion_porcentual[i, j] = ((precios_acciones[i, j + 1] - precios_acciones[i, j]) /
-                                          precios_acciones[i, j]) * 100
+    # (N x M) → (N x M-1): una sola operación vectorizada sobre toda la matriz.
+    # Precios enteros (p. ej. centavos) dan variaciones en float64.
+    anteriores = precios_acciones[:, :-1]
+    variacion_porcentual = np.subtract(precios_acciones[:, 1:], anteriores,
+                                       dtype=dtype_flotante(precios_acciones.dtype))
+    np.divide(variacion_porcentual, anteriores, out=variacion_porcentual)
+    variacion_porcentual *= 100
     return variacion_porcentual
 
 
-def realizar_transformaciones(precios_acciones):
+def realizar_transformaciones(precios_acciones, dias_proyeccion=5, momentos=None):
+    if momentos is None:
+        momentos = calcular_momentos(precios_acciones)
+
     log_precios = np.log(precios_acciones)
     rendimientos_continuos = np.diff(log_precios, axis=1)
 
-    precios_normalizados = (precios_acciones - np.mean(precios_acciones, axis=1, keepdims=True)) / \
-                           np.std(precios_acciones, axis=1, keepdims=True)
+    precios_normalizados = precios_acciones - momentos.media[:, np.newaxis]
+    precios_normalizados /= momentos.desviacion[:, np.newaxis]
 
-    tasa_crecimiento = 0.02
-    proyeccion = precios_acciones[:, -1:] * np.exp(tasa_crecimiento * np.arange(1, 6))
+    # Mediana de un GBM calibrado con la deriva logarítmica histórica de
+    # cada acción: S_t = S_0 · exp(μ·t). Las bandas alrededor de esta
+    # mediana las da proyeccion_gbm.bandas_gbm().
+    deriva = np.mean(rendimientos_continuos, axis=1, keepdims=True)
+    dias = np.arange(1, dias_proyeccion + 1, dtype=momentos.media.dtype)
+    proyeccion = precios_acciones[:, -1:] * np.exp(deriva * dias)
 
     return rendimientos_continuos, precios_normalizados, proyeccion
 
 
-def calcular_metricas_finales(precios_acciones, variacion_porcentual):
-    acciones_poseidas = 100
-    valor_inicial = np.sum(precios_acciones[:, 0]) * acciones_poseidas
-    valor_final = np.sum(precios_acciones[:, -1]) * acciones_poseidas
+def calcular_metricas_finales(precios_acciones, variacion_porcentual, momentos_variacion=None,
+                              acciones_poseidas=100):
+    # acciones_poseidas: escalar (misma cantidad por acción) o vector (N).
+    # Los valores del portafolio conservan el dtype de los precios.
+    if momentos_variacion is None:
+        momentos_variacion = calcular_momentos(variacion_porcentual)
+
+    if np.ndim(acciones_poseidas) == 0:
+        valor_inicial = np.sum(precios_acciones[:, 0]) * acciones_poseidas
+        valor_final = np.sum(precios_acciones[:, -1]) * acciones_poseidas
+    else:
+        acciones_poseidas = np.asarray(acciones_poseidas, dtype=precios_acciones.dtype)
+        valor_inicial = precios_acciones[:, 0] @ acciones_poseidas
+        valor_final = precios_acciones[:, -1] @ acciones_poseidas
     rendimiento_portafolio = ((valor_final - valor_inicial) / valor_inicial) * 100
 
-    volatilidad_diaria = np.std(variacion_porcentual, axis=1)
-    sharpe_ratio = np.mean(variacion_porcentual, axis=1) / np.std(variacion_porcentual, axis=1)
+    volatilidad_diaria = momentos_variacion.desviacion
+    sharpe_ratio = momentos_variacion.media / volatilidad_diaria
 
-    return valor_inicial, valor_final, rendimiento_portafolio, volatilidad_diaria, sharpe_ratio
\ No newline at end of file
+    return valor_inicial, valor_final, rendimiento_portafolio, volatilidad_diaria, sharpe_ratio
@@ -0,0 +1,287 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.analisis import (calcular_estadisticas, calcular_variaciones,
+                          realizar_transformaciones, calcular_metricas_finales)
+from src.datos import generar_datos
+from src.paralelo import (calcular_estadisticas_paralelo, calcular_variaciones_paralelo,
+                          realizar_transformaciones_paralelo, calcular_metricas_finales_paralelo,
+                          hilos_por_defecto)
+
+TAMANOS = [(100, 250), (1000, 1000), (5000, 2500)]
+TIPOS = ['float32', 'float64']
+TIPO_REFERENCIA = 'float64'
+TOLERANCIA_REGRESION = 0.15
+
+# Arranque de la CLI: comandos medidos y tiempo máximo aceptable (segundos)
+RUTA_MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+COMANDOS_ARRANQUE = [['--help'], ['stats']]
+LIMITE_ARRANQUE = 1.0
+
+# Módulos que cada comando no debe importar (ver el comentario de main.py)
+MODULOS_EXCLUIDOS = {
+    '--help': ['numpy', 'src.datos', 'src.cache', 'src.reportes'],
+    'stats': ['src.proyeccion_gbm', 'src.portafolio', 'src.benchmark', 'src.paralelo',
+              'concurrent.futures'],
+}
+
+
+def medir(funcion, *args, repeticiones=7, calentamiento=2, **kwargs):
+    # Tiempos con perf_counter; las primeras llamadas (calentamiento) se
+    # descartan para no medir asignación inicial de memoria ni cachés frías.
+    for _ in range(calentamiento):
+        funcion(*args, **kwargs)
+
+    muestras = np.empty(repeticiones)
+    for i in range(repeticiones):
+        t_ini = time.perf_counter()
+        funcion(*args, **kwargs)
+        muestras[i] = time.perf_counter() - t_ini
+
+    q1, mediana, q3 = np.percentile(muestras, [25, 50, 75])
+    return {
+        'mediana': float(mediana),
+        'iqr': float(q3 - q1),
+        'minimo': float(muestras.min()),
+        'repeticiones': repeticiones,
+    }
+
+
+def casos_de_prueba(precios, n_hilos=None):
+    # Con n_hilos, las variantes multihilo de src.paralelo (0 = hilos por defecto)
+    variaciones = calcular_variaciones(precios)
+    if n_hilos is None:
+        funciones = (calcular_estadisticas, calcular_variaciones,
+                     realizar_transformaciones, calcular_metricas_finales)
+    else:
+        funciones = [functools.partial(funcion, n_hilos=n_hilos or None)
+                     for funcion in (calcular_estadisticas_paralelo, calcular_variaciones_paralelo,
+                                     realizar_transformaciones_paralelo,
+                                     calcular_metricas_finales_paralelo)]
+    return {
+        'calcular_estadisticas': (funciones[0], (precios,)),
+        'calcular_variaciones': (funciones[1], (precios,)),
+        'realizar_transformaciones': (funciones[2], (precios,)),
+        'calcular_metricas_finales': (funciones[3], (precios, variaciones)),
+    }
+
+
+def _salidas(resultado):
+    # Arreglos de salida de una función de análisis (tupla o arreglo único)
+    partes = resultado if isinstance(resultado, tuple) else (resultado,)
+    return [np.asarray(parte, dtype=np.float64) for parte in partes]
+
+
+def error_relativo(resultado, referencia):
+    # Error relativo en norma máxima, peor caso entre las salidas:
+    # max|x - x_ref| / max|x_ref|. Se usa la norma y no el error por
+    # elemento porque variaciones y z-scores tienen valores cercanos a 0.
+    errores = [np.max(np.abs(x - r)) / max(np.max(np.abs(r)), np.finfo(np.float64).tiny)
+               for x, r in zip(_salidas(resultado), _salidas(referencia)) if r.size]
+    return float(max(errores, default=0.0))
+
+
+def ejecutar_suite(tamanos=TAMANOS, tipos=TIPOS, repeticiones=7, calentamiento=2, n_hilos=None):
+    # Además del tiempo, cada medición registra su error respecto del cálculo
+    # en float64 (error_relativo) y su aceleración respecto de float64 si ese
+    # tipo también se midió: el compromiso precisión / velocidad de float32.
+    # Con n_hilos se miden las variantes de src.paralelo; la referencia sigue
+    # siendo la serial, así que el error muestra también si difieren.
+    hilos = 1 if n_hilos is None else n_hilos or hilos_por_defecto()
+    resultados = []
+    for n_acciones, n_dias in tamanos:
+        precios_ref, _, _ = generar_datos(n_acciones, n_dias, dtype=TIPO_REFERENCIA)
+        referencias = {nombre: funcion(*args)
+                       for nombre, (funcion, args) in casos_de_prueba(precios_ref).items()}
+        tiempos_ref = {}
+        for tipo in tipos:
+            precios = precios_ref if tipo == TIPO_REFERENCIA else \
+                generar_datos(n_acciones, n_dias, dtype=tipo)[0]
+            for nombre, (funcion, args) in casos_de_prueba(precios, n_hilos).items():
+                medicion = medir(funcion, *args, repeticiones=repeticiones,
+                                 calentamiento=calentamiento)
+                medicion.update({
+                    'funcion': nombre,
+                    'forma': [n_acciones, n_dias],
+                    'dtype': tipo,
+                    'hilos': hilos,
+                    'elementos_por_segundo': n_acciones * n_dias / medicion['mediana'],
+                    'error_relativo': error_relativo(funcion(*args), referencias[nombre]),
+                })
+                if tipo == TIPO_REFERENCIA:
+                    tiempos_ref[nombre] = medicion['mediana']
+                resultados.append(medicion)
+        for medicion in resultados[-len(tipos) * len(referencias):]:
+            referencia = tiempos_ref.get(medicion['funcion'])
+            medicion['aceleracion'] = referencia / medicion['mediana'] if referencia else None
+    return resultados
+
+
+def promedio_python(matriz):
+    return [sum(fila) / len(fila) for fila in matriz]
+
+
+def comparar_con_python(forma=(1000, 1000)):
+    # Promedio por fila con NumPy frente a bucles de Python puro
+    datos = np.random.uniform(50, 150, forma)
+    t_numpy = medir(np.mean, datos, axis=1)['mediana']
+    t_python = medir(promedio_python, datos, repeticiones=3, calentamiento=0)['mediana']
+    return t_numpy, t_python
+
+
+def modulos_importados(comando):
+    # Módulos que importa `python main.py <comando>`, según -X importtime
+    # (una línea "import time: propio | acumulado | nombre" por módulo)
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', RUTA_MAIN, *comando],
+                             check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             text=True)
+    return {linea.rsplit('|', 1)[1].strip() for linea in proceso.stderr.splitlines()
+            if linea.startswith('import time:') and linea.count('|') == 2}
+
+
+def medir_arranque(comandos=COMANDOS_ARRANQUE, repeticiones=5, excluidos=MODULOS_EXCLUIDOS):
+    # Tiempo de pared de `python main.py <comando>` en un proceso nuevo:
+    # intérprete + imports + ejecución, y los módulos de `excluidos` que el
+    # comando importó aunque no debía (lista vacía si ninguno).
+    resultados = []
+    for comando in comandos:
+        cargados = modulos_importados(comando)
+        indebidos = [m for m in excluidos.get(' '.join(comando), []) if m in cargados]
+        muestras = np.empty(repeticiones)
+        for i in range(repeticiones):
+            t_ini = time.perf_counter()
+            subprocess.run([sys.executable, RUTA_MAIN, *comando], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            muestras[i] = time.perf_counter() - t_ini
+        q1, mediana, q3 = np.percentile(muestras, [25, 50, 75])
+        resultados.append({
+            'comando': ' '.join(comando),
+            'mediana': float(mediana),
+            'iqr': float(q3 - q1),
+            'minimo': float(muestras.min()),
+            'repeticiones': repeticiones,
+            'indebidos': indebidos,
+        })
+    return resultados
+
+
+def _clave(resultado):
+    clave = f"{resultado['funcion']}|{resultado['forma'][0]}x{resultado['forma'][1]}|{resultado['dtype']}"
+    # Las líneas base anteriores a --hilos son seriales
+    hilos = resultado.get('hilos', 1)
+    return clave if hilos == 1 else f"{clave}|{hilos} hilos"
+
+
+def guardar_resultados(resultados, ruta):
+    documento = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(documento, archivo, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def comparar_con_base(resultados, ruta_base, tolerancia=TOLERANCIA_REGRESION):
+    # Una medición es regresión si su mediana supera la de la línea base en
+    # más de `tolerancia` y la diferencia es mayor que el ruido (IQR) de ambas.
+    with open(ruta_base, encoding='utf-8') as archivo:
+        base = {_clave(r): r for r in json.load(archivo)['resultados']}
+
+    regresiones = []
+    for actual in resultados:
+        previo = base.get(_clave(actual))
+        if previo is None:
+            continue
+        diferencia = actual['mediana'] - previo['mediana']
+        ruido = actual['iqr'] + previo['iqr']
+        if diferencia > tolerancia * previo['mediana'] and diferencia > ruido:
+            regresiones.append({
+                'clave': _clave(actual),
+                'base': previo['mediana'],
+                'actual': actual['mediana'],
+                'factor': actual['mediana'] / previo['mediana'],
+            })
+    return regresiones
+
+
+def _parsear_tamano(texto):
+    n_acciones, n_dias = texto.lower().split('x')
+    return int(n_acciones), int(n_dias)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de las funciones de analisis.py')
+    parser.add_argument('--tamanos', nargs='+', type=_parsear_tamano,
+                        default=TAMANOS, metavar='NxM')
+    parser.add_argument('--tipos', nargs='+', choices=TIPOS, default=TIPOS)
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--calentamiento', type=int, default=2)
+    parser.add_argument('--hilos', type=int, metavar='N',
+                        help='medir las variantes multihilo de src.paralelo con N hilos '
+                             '(0 = NUMPY_HILOS o todos los núcleos)')
+    parser.add_argument('--guardar', metavar='RUTA_JSON')
+    parser.add_argument('--comparar', metavar='RUTA_BASE_JSON')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_REGRESION)
+    parser.add_argument('--python', action='store_true',
+                        help='incluir la comparación NumPy vs. Python con bucles')
+    parser.add_argument('--arranque', action='store_true',
+                        help='medir el tiempo de arranque de la CLI (main.py)')
+    parser.add_argument('--limite-arranque', type=float, default=LIMITE_ARRANQUE, metavar='SEG')
+    parser.add_argument('--sin-suite', action='store_true')
+    args = parser.parse_args(argv)
+
+    from src.reportes import imprimir_arranque, imprimir_benchmark, imprimir_suite_benchmark
+
+    if args.python:
+        imprimir_benchmark(*comparar_con_python())
+
+    codigo = 0
+    if args.arranque:
+        arranques = medir_arranque()
+        imprimir_arranque(arranques)
+        lentos = [a for a in arranques if a['mediana'] > args.limite_arranque]
+        for a in lentos:
+            print(f"⚠️  'main.py {a['comando']}' tarda {a['mediana']:.3f}s "
+                  f"(límite {args.limite_arranque:.3f}s)")
+        indebidos = [a for a in arranques if a['indebidos']]
+        for a in indebidos:
+            print(f"⚠️  'main.py {a['comando']}' importa {', '.join(a['indebidos'])}")
+        codigo = 1 if lentos or indebidos else 0
+
+    if args.sin_suite:
+        return codigo
+
+    resultados = ejecutar_suite(args.tamanos, args.tipos, args.repeticiones, args.calentamiento,
+                                args.hilos)
+    imprimir_suite_benchmark(resultados)
+
+    if args.guardar:
+        guardar_resultados(resultados, args.guardar)
+        print(f"\nResultados guardados en {args.guardar}")
+
+    if args.comparar:
+        regresiones = comparar_con_base(resultados, args.comparar, args.tolerancia)
+        if regresiones:
+            print(f"\n⚠️  {len(regresiones)} regresiones respecto de {args.comparar}:")
+            for r in regresiones:
+                print(f"    {r['clave']}: {r['base']:.6f}s → {r['actual']:.6f}s ({r['factor']:.2f}x)")
+            return 1
+        print(f"\nSin regresiones respecto de {args.comparar}")
+    return codigo
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
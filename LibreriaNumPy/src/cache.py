@@ -0,0 +1,337 @@
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from src.analisis import (calcular_estadisticas, calcular_variaciones,
+                          realizar_transformaciones, calcular_metricas_finales)
+from src.momentos import calcular_momentos
+
+# Límite de la caché en memoria (suma de nbytes de los resultados guardados)
+BYTES_MAXIMOS_CACHE = 512 << 20
+
+# Directorio de la caché en disco: variable de entorno NUMPY_CACHE_DIR o
+# ninguno (sólo memoria)
+DIRECTORIO_CACHE = os.environ.get('NUMPY_CACHE_DIR') or None
+
+# Cambiar si se modifica el formato de la caché en disco
+VERSION_CACHE = 1
+
+
+# Huellas de los arreglos inmutables que crea la caché (id → (weakref,
+# huella)): resultados guardados o leídos de disco y matrices pasadas por
+# congelar(). Son vistas sobre un memoryview de sólo lectura, a las que
+# NumPy no deja volver a habilitar la escritura, así que su contenido no
+# cambia y sus bytes no se vuelven a leer. Cualquier otro arreglo (aunque
+# esté marcado de sólo lectura) se hashea en cada llamada.
+_HUELLAS_INMUTABLES = {}
+
+
+def _inmutable(arreglo):
+    arreglo = np.ascontiguousarray(arreglo)
+    vista = np.frombuffer(memoryview(arreglo).toreadonly(), dtype=arreglo.dtype)
+    return vista.reshape(arreglo.shape)
+
+
+def _registrar(arreglo, digesto):
+    clave = id(arreglo)
+    _HUELLAS_INMUTABLES[clave] = (
+        weakref.ref(arreglo, lambda _: _HUELLAS_INMUTABLES.pop(clave, None)), digesto)
+
+
+def _huella_arreglo(arreglo):
+    conocido = _HUELLAS_INMUTABLES.get(id(arreglo))
+    if conocido is not None and conocido[0]() is arreglo:
+        return conocido[1]
+    # SHA-1 como hash de contenido (no de seguridad): con instrucciones SHA
+    # del procesador lee más de 1 GB/s, el doble que BLAKE2b.
+    h = hashlib.sha1(f'nd{arreglo.shape}{arreglo.dtype.str}'.encode(), usedforsecurity=False)
+    if arreglo.size:
+        # Un memoryview con una dimensión 0 no admite cast('B'); forma y
+        # dtype ya identifican a un arreglo vacío
+        h.update(memoryview(np.ascontiguousarray(arreglo)).cast('B'))
+    return h.digest()
+
+
+def congelar(arreglo):
+    # Copia inmutable de `arreglo` con la huella ya calculada: las llamadas
+    # siguientes con esta matriz no vuelven a leer sus bytes. Conviene para
+    # la matriz de precios, que entra en casi todas las claves.
+    copia = _inmutable(np.array(arreglo, order='C'))
+    _registrar(copia, _huella_arreglo(copia))
+    return copia
+
+
+def _actualizar_huella(h, valor):
+    # Arreglos por forma, dtype y bytes; tuplas (y namedtuples) elemento a
+    # elemento; el resto de los parámetros por su repr.
+    if isinstance(valor, np.ndarray):
+        h.update(_huella_arreglo(valor))
+    elif isinstance(valor, tuple):
+        h.update(f'tupla{len(valor)}('.encode())
+        for elemento in valor:
+            _actualizar_huella(h, elemento)
+        h.update(b')')
+    else:
+        h.update(f'{type(valor).__name__}:{valor!r};'.encode())
+
+
+def huella(*valores):
+    # Hash del contenido de los valores (hexadecimal, 40 caracteres)
+    h = hashlib.sha1(usedforsecurity=False)
+    for valor in valores:
+        _actualizar_huella(h, valor)
+    return h.hexdigest()
+
+
+def _reconstruir(resultado, partes):
+    if not isinstance(resultado, tuple):
+        return partes[0]
+    return type(resultado)(*partes) if hasattr(resultado, '_fields') else tuple(partes)
+
+
+def _solo_lectura(resultado, clave):
+    # Los resultados se comparten entre llamadas: nadie debe modificarlos.
+    # Cada arreglo se vuelve inmutable y su huella se deriva de la clave
+    # (la clave determina el contenido), así pasar un resultado a otra
+    # función con caché no obliga a hashear sus bytes.
+    partes = list(resultado) if isinstance(resultado, tuple) else [resultado]
+    for k, parte in enumerate(partes):
+        if isinstance(parte, np.ndarray):
+            partes[k] = _inmutable(parte)
+            _registrar(partes[k], hashlib.sha1(f'{clave}.{k}'.encode(), usedforsecurity=False).digest())
+    return _reconstruir(resultado, partes)
+
+
+def _arreglos(valor):
+    if isinstance(valor, np.ndarray):
+        yield valor
+    elif isinstance(valor, tuple):
+        for elemento in valor:
+            yield from _arreglos(elemento)
+
+
+def _copiar_compartidos(resultado, argumentos):
+    # Un resultado puede devolver tal cual un arreglo recibido (p. ej.
+    # calcular_estadisticas con momentos=): se copia para no dejar de sólo
+    # lectura un arreglo del llamador.
+    recibidos = {id(arreglo) for valor in argumentos for arreglo in _arreglos(valor)}
+    partes = resultado if isinstance(resultado, tuple) else (resultado,)
+    return _reconstruir(resultado, [parte.copy() if id(parte) in recibidos else parte
+                                    for parte in partes])
+
+
+def _bytes_resultado(resultado):
+    partes = resultado if isinstance(resultado, tuple) else (resultado,)
+    return sum(np.asarray(parte).nbytes for parte in partes)
+
+
+class CacheResultados:
+    # Caché de dos niveles para resultados de funciones de análisis:
+    #   memoria → LRU acotada a `bytes_maximos`
+    #   disco   → un .npy por arreglo del resultado en `directorio` (opcional),
+    #             más un .json que describe cómo rearmar el resultado
+    def __init__(self, bytes_maximos=BYTES_MAXIMOS_CACHE, directorio=DIRECTORIO_CACHE):
+        self.bytes_maximos = bytes_maximos
+        self.directorio = directorio
+        self._entradas = OrderedDict()
+        self.bytes_usados = 0
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    def obtener(self, clave):
+        if clave in self._entradas:
+            self._entradas.move_to_end(clave)
+            self.aciertos_memoria += 1
+            return True, self._entradas[clave]
+        if self.directorio:
+            resultado = self._leer_disco(clave)
+            if resultado is not None:
+                self.aciertos_disco += 1
+                self._guardar_memoria(clave, resultado)
+                return True, resultado
+        self.fallos += 1
+        return False, None
+
+    def guardar(self, clave, resultado):
+        resultado = _solo_lectura(resultado, clave)
+        self._guardar_memoria(clave, resultado)
+        if self.directorio:
+            self._escribir_disco(clave, resultado)
+        return resultado
+
+    def _guardar_memoria(self, clave, resultado):
+        tamano = _bytes_resultado(resultado)
+        if tamano > self.bytes_maximos:
+            return
+        if clave in self._entradas:
+            self.bytes_usados -= _bytes_resultado(self._entradas.pop(clave))
+        self._entradas[clave] = resultado
+        self.bytes_usados += tamano
+        while self.bytes_usados > self.bytes_maximos:
+            _, expulsado = self._entradas.popitem(last=False)
+            self.bytes_usados -= _bytes_resultado(expulsado)
+
+    def _ruta(self, clave, sufijo):
+        return os.path.join(self.directorio, clave + sufijo)
+
+    def _escribir_disco(self, clave, resultado):
+        es_tupla = isinstance(resultado, tuple)
+        partes = resultado if es_tupla else (resultado,)
+        for k, parte in enumerate(partes):
+            # np.save agrega '.npy' a rutas sin esa extensión: el temporal
+            # termina en '.tmp.npy' y se renombra al final (escritura atómica)
+            temporal = self._ruta(clave, f'.{k}.tmp.npy')
+            np.save(temporal, np.asarray(parte))
+            os.replace(temporal, self._ruta(clave, f'.{k}.npy'))
+        tipo = type(resultado)
+        descripcion = {
+            'version': VERSION_CACHE,
+            'partes': len(partes),
+            'escalares': [np.ndim(parte) == 0 for parte in partes],
+            'tupla': es_tupla,
+            'tipo': f'{tipo.__module__}.{tipo.__qualname__}' if hasattr(tipo, '_fields') else None,
+        }
+        # El .json se escribe al final: si existe, la entrada está completa
+        temporal = self._ruta(clave, '.json.tmp')
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(descripcion, archivo)
+        os.replace(temporal, self._ruta(clave, '.json'))
+
+    def _leer_disco(self, clave):
+        try:
+            with open(self._ruta(clave, '.json'), encoding='utf-8') as archivo:
+                descripcion = json.load(archivo)
+            if descripcion['version'] != VERSION_CACHE:
+                return None
+            partes = []
+            for k, escalar in enumerate(descripcion['escalares']):
+                parte = np.load(self._ruta(clave, f'.{k}.npy'), allow_pickle=False)
+                partes.append(parte[()] if escalar else parte)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if not descripcion['tupla']:
+            return _solo_lectura(partes[0], clave)
+        if descripcion['tipo']:
+            modulo, _, nombre = descripcion['tipo'].rpartition('.')
+            return _solo_lectura(getattr(importlib.import_module(modulo), nombre)(*partes), clave)
+        return _solo_lectura(tuple(partes), clave)
+
+    def limpiar(self, disco=False):
+        self._entradas.clear()
+        self.bytes_usados = 0
+        if disco and self.directorio:
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(('.npy', '.json')):
+                    os.remove(os.path.join(self.directorio, nombre))
+
+    def estadisticas(self):
+        return {
+            'entradas': len(self._entradas),
+            'bytes_usados': self.bytes_usados,
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+        }
+
+
+CACHE = CacheResultados()
+
+
+def _modulos_propios(modulo, encontrados):
+    # `modulo` y, recursivamente, los módulos de su mismo paquete que usa:
+    # importados directamente o que definen las funciones que importa
+    paquete = modulo.__name__.split('.')[0] + '.'
+    encontrados[modulo.__name__] = modulo
+    for valor in vars(modulo).values():
+        nombre = valor.__name__ if inspect.ismodule(valor) else getattr(valor, '__module__', None)
+        if (isinstance(nombre, str) and nombre.startswith(paquete)
+                and nombre not in encontrados and nombre in sys.modules):
+            _modulos_propios(sys.modules[nombre], encontrados)
+    return encontrados
+
+
+@functools.cache
+def _huella_codigo(funcion):
+    # El código fuente entra en la clave: el del módulo de la función y el
+    # de los módulos del paquete de los que depende (p. ej. analisis.py
+    # llama a calcular_momentos de momentos.py). Si cualquiera cambia, las
+    # entradas en disco de la versión anterior dejan de coincidir. Se
+    # calcula en la primera llamada, no al importar el módulo.
+    modulos = _modulos_propios(sys.modules[funcion.__module__], {})
+    fuentes = []
+    for nombre in sorted(modulos):
+        try:
+            fuentes.append(inspect.getsource(modulos[nombre]))
+        except (OSError, TypeError):
+            fuentes.append('')
+    return huella(f'{funcion.__module__}.{funcion.__qualname__}', *sorted(modulos), *fuentes)
+
+
+def memoizar(funcion, cache=None):
+    # Envuelve `funcion` para que los resultados se busquen primero en la
+    # caché. La clave combina la función y todos sus argumentos (incluidos
+    # los por defecto): la misma matriz con los mismos parámetros no se
+    # vuelve a calcular. Los arreglos del resultado son de sólo lectura.
+    firma = inspect.signature(funcion)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        destino = cache or CACHE
+        if destino is None:
+            # Caché desactivada (CACHE = None): llamada directa
+            return funcion(*args, **kwargs)
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        clave = huella(_huella_codigo(funcion), *(valor for item in sorted(argumentos.arguments.items())
+                                 for valor in item))
+        encontrado, resultado = destino.obtener(clave)
+        if encontrado:
+            return resultado
+        resultado = funcion(*args, **kwargs)
+        return destino.guardar(clave, _copiar_compartidos(resultado, argumentos.arguments.values()))
+
+    return envoltura
+
+
+calcular_momentos_cache = memoizar(calcular_momentos)
+calcular_estadisticas_cache = memoizar(calcular_estadisticas)
+calcular_variaciones_cache = memoizar(calcular_variaciones)
+realizar_transformaciones_cache = memoizar(realizar_transformaciones)
+calcular_metricas_finales_cache = memoizar(calcular_metricas_finales)
+
+
+@functools.cache
+def _memoizada(modulo, nombre):
+    # El módulo se importa en la primera llamada: `main.py stats` no carga
+    # src.proyeccion_gbm, ni src.paralelo si no se pide --hilos
+    return memoizar(getattr(importlib.import_module(modulo), nombre))
+
+
+def bandas_gbm_cache(*args, **kwargs):
+    return _memoizada('src.proyeccion_gbm', 'bandas_gbm')(*args, **kwargs)
+
+
+# Variantes multihilo (src.paralelo). Dan el mismo resultado que las seriales,
+# pero n_hilos forma parte de la clave.
+def calcular_momentos_paralelo_cache(*args, **kwargs):
+    return _memoizada('src.paralelo', 'calcular_momentos_paralelo')(*args, **kwargs)
+
+
+def calcular_variaciones_paralelo_cache(*args, **kwargs):
+    return _memoizada('src.paralelo', 'calcular_variaciones_paralelo')(*args, **kwargs)
+
+
+def realizar_transformaciones_paralelo_cache(*args, **kwargs):
+    return _memoizada('src.paralelo', 'realizar_transformaciones_paralelo')(*args, **kwargs)
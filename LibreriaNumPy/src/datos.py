@@ -1,14 +1,47 @@
 import numpy as np
 
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes']
+NOMBRES_BASE = ['TECH-A', 'BANK-B', 'ENERGY-C', 'RETAIL-D', 'PHARMA-E']
 
-def generar_datos():
-    np.random.seed(42)
-    # Simulación de datos financieros
-    precios_base = np.random.uniform(50, 150, (5, 5))
-    variaciones = np.random.uniform(0.95, 1.05, (5, 5))
-    precios_acciones = precios_base * variaciones
 
-    nombres_acciones = ['TECH-A', 'BANK-B', 'ENERGY-C', 'RETAIL-D', 'PHARMA-E']
-    dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes']
+# Filas generadas por vez cuando dtype no es float64 (ver generar_datos)
+FILAS_POR_LOTE = 1024
 
-    return precios_acciones, nombres_acciones, dias
\ No newline at end of file
+
+def _generar_en_lotes(n_acciones, n_dias, dtype):
+    # np.random.uniform sólo produce float64: se genera por lotes de filas y
+    # se convierte a `dtype` al vuelo, sin una matriz float64 completa. El
+    # orden de los números aleatorios es el mismo que en float64.
+    precios_acciones = np.empty((n_acciones, n_dias), dtype=dtype)
+    for inicio in range(0, n_acciones, FILAS_POR_LOTE):
+        fin = min(inicio + FILAS_POR_LOTE, n_acciones)
+        precios_acciones[inicio:fin] = np.random.uniform(50, 150, (fin - inicio, n_dias))
+    for inicio in range(0, n_acciones, FILAS_POR_LOTE):
+        fin = min(inicio + FILAS_POR_LOTE, n_acciones)
+        precios_acciones[inicio:fin] *= np.random.uniform(0.95, 1.05, (fin - inicio, n_dias)).astype(dtype)
+    return precios_acciones
+
+
+def generar_datos(n_acciones=5, n_dias=5, semilla=42, dtype=np.float64):
+    np.random.seed(semilla)
+    # Simulación de datos financieros (N acciones x M días)
+    if np.dtype(dtype) == np.float64:
+        precios_base = np.random.uniform(50, 150, (n_acciones, n_dias))
+        variaciones = np.random.uniform(0.95, 1.05, (n_acciones, n_dias))
+        precios_acciones = precios_base * variaciones
+    else:
+        precios_acciones = _generar_en_lotes(n_acciones, n_dias, dtype)
+
+    if n_acciones <= len(NOMBRES_BASE):
+        nombres_acciones = NOMBRES_BASE[:n_acciones]
+    else:
+        nombres_acciones = [f'ACC-{i:05d}' for i in range(1, n_acciones + 1)]
+
+    return precios_acciones, nombres_acciones, etiquetas_dias(n_dias)
+
+
+def etiquetas_dias(n_dias):
+    # Nombres de la semana hasta 5 días; con más, D1..Dn
+    if n_dias <= len(DIAS_SEMANA):
+        return DIAS_SEMANA[:n_dias]
+    return [f'D{j}' for j in range(1, n_dias + 1)]
@@ -0,0 +1,217 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from src.analisis import calcular_variaciones
+from src.momentos import Momentos, calcular_momentos, dtype_flotante
+
+# Un histórico en disco se compone de tres archivos con la misma base:
+#   <base>.npy  (o .bin en binario crudo)  → matriz de precios N acciones x M días
+#   <base>.tickers.txt                      → un nombre de acción por línea (N)
+#   <base>.fechas.txt                       → una fecha por línea (M)
+SUFIJO_TICKERS = '.tickers.txt'
+SUFIJO_FECHAS = '.fechas.txt'
+
+# Memoria de trabajo máxima por bloque (precios + temporales del bloque)
+BYTES_POR_BLOQUE_DISCO = 64 << 20
+
+ResultadoHistorico = namedtuple('ResultadoHistorico', [
+    'momentos', 'momentos_variacion',
+    'valor_inicial', 'valor_final', 'rendimiento_portafolio',
+])
+
+
+def _base(ruta):
+    raiz, extension = os.path.splitext(ruta)
+    return raiz if extension in ('.npy', '.bin') else ruta
+
+
+def _leer_indice(ruta):
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        return [linea.rstrip('\n') for linea in archivo]
+
+
+def _escribir_indice(ruta, valores):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.writelines(f'{valor}\n' for valor in valores)
+
+
+def guardar_historico(ruta, precios, nombres, dias):
+    base = _base(ruta)
+    np.save(base + '.npy', precios)
+    _escribir_indice(base + SUFIJO_TICKERS, nombres)
+    _escribir_indice(base + SUFIJO_FECHAS, dias)
+    return base + '.npy'
+
+
+def crear_historico(ruta, n_acciones, n_dias, dtype=np.float64):
+    # Reserva en disco una matriz .npy vacía, para llenarla por bloques
+    # (p. ej. desde un proveedor de datos) sin tenerla completa en memoria.
+    return np.lib.format.open_memmap(_base(ruta) + '.npy', mode='w+',
+                                     dtype=dtype, shape=(n_acciones, n_dias))
+
+
+def abrir_historico(ruta, forma=None, dtype=np.float64):
+    # .npy → np.load con mmap_mode (forma y dtype vienen en la cabecera).
+    # .bin → binario crudo en orden C; requiere `forma` = (N acciones, M días).
+    base = _base(ruta)
+    if ruta.endswith('.bin'):
+        if forma is None:
+            raise ValueError('Un histórico .bin requiere forma=(n_acciones, n_dias)')
+        precios = np.memmap(ruta, mode='r', dtype=dtype, shape=tuple(forma))
+    else:
+        precios = np.load(base + '.npy', mmap_mode='r')
+
+    nombres = _leer_indice(base + SUFIJO_TICKERS)
+    dias = _leer_indice(base + SUFIJO_FECHAS)
+    if nombres is not None and len(nombres) != precios.shape[0]:
+        raise ValueError(f'{len(nombres)} tickers para {precios.shape[0]} filas de precios')
+    if dias is not None and len(dias) != precios.shape[1]:
+        raise ValueError(f'{len(dias)} fechas para {precios.shape[1]} columnas de precios')
+    return precios, nombres, dias
+
+
+def _crear_salida(ruta, forma, dtype):
+    if ruta is None:
+        return None
+    return np.lib.format.open_memmap(ruta, mode='w+', dtype=dtype, shape=forma)
+
+
+def _valores_portafolio(primera_columna, ultima_columna):
+    acciones_poseidas = 100
+    valor_inicial = np.sum(primera_columna) * acciones_poseidas
+    valor_final = np.sum(ultima_columna) * acciones_poseidas
+    rendimiento_portafolio = ((valor_final - valor_inicial) / valor_inicial) * 100
+    return valor_inicial, valor_final, rendimiento_portafolio
+
+
+def analizar_por_filas(precios, bytes_por_bloque=BYTES_POR_BLOQUE_DISCO,
+                       ruta_variaciones=None, ruta_rendimientos=None):
+    # Recorre el histórico en bloques de filas completas (acciones). Cada
+    # bloque se lee una vez del disco y se le aplican los mismos núcleos que
+    # a una matriz en memoria, así que el resultado es idéntico al análisis
+    # en RAM. Las matrices derivadas (N x M-1) se escriben opcionalmente a
+    # disco en lugar de acumularse en memoria.
+    n_acciones, n_dias = precios.shape
+    flotante = dtype_flotante(precios.dtype)
+    # Precios + variaciones + temporales de momentos ≈ 4 copias del bloque
+    filas = max(1, bytes_por_bloque // (4 * n_dias * flotante.itemsize))
+
+    media = np.empty(n_acciones, dtype=flotante)
+    desviacion = np.empty(n_acciones, dtype=flotante)
+    maximo = np.empty(n_acciones, dtype=precios.dtype)
+    minimo = np.empty(n_acciones, dtype=precios.dtype)
+    media_var = np.empty(n_acciones, dtype=flotante)
+    desviacion_var = np.empty(n_acciones, dtype=flotante)
+    maximo_var = np.empty(n_acciones, dtype=flotante)
+    minimo_var = np.empty(n_acciones, dtype=flotante)
+    primera_columna = np.empty(n_acciones, dtype=precios.dtype)
+    ultima_columna = np.empty(n_acciones, dtype=precios.dtype)
+
+    salida_variaciones = _crear_salida(ruta_variaciones, (n_acciones, n_dias - 1), flotante)
+    salida_rendimientos = _crear_salida(ruta_rendimientos, (n_acciones, n_dias - 1), flotante)
+
+    for inicio in range(0, n_acciones, filas):
+        fin = min(inicio + filas, n_acciones)
+        bloque = np.asarray(precios[inicio:fin])
+
+        m = calcular_momentos(bloque)
+        media[inicio:fin], desviacion[inicio:fin] = m.media, m.desviacion
+        maximo[inicio:fin], minimo[inicio:fin] = m.maximo, m.minimo
+
+        variaciones = calcular_variaciones(bloque)
+        mv = calcular_momentos(variaciones)
+        media_var[inicio:fin], desviacion_var[inicio:fin] = mv.media, mv.desviacion
+        maximo_var[inicio:fin], minimo_var[inicio:fin] = mv.maximo, mv.minimo
+
+        primera_columna[inicio:fin] = bloque[:, 0]
+        ultima_columna[inicio:fin] = bloque[:, -1]
+
+        if salida_variaciones is not None:
+            salida_variaciones[inicio:fin] = variaciones
+        if salida_rendimientos is not None:
+            salida_rendimientos[inicio:fin] = np.diff(np.log(bloque), axis=1)
+
+    for salida in (salida_variaciones, salida_rendimientos):
+        if salida is not None:
+            salida.flush()
+
+    return ResultadoHistorico(
+        Momentos(media, desviacion, maximo, minimo),
+        Momentos(media_var, desviacion_var, maximo_var, minimo_var),
+        *_valores_portafolio(primera_columna, ultima_columna),
+    )
+
+
+class _AcumuladorMomentos:
+    # Combina momentos de bloques de columnas consecutivos (fórmula de Chan
+    # et al. para media y suma de cuadrados), sin volver a leer los datos.
+    # Los acumuladores (un valor por acción) son float64 aunque los bloques
+    # sean float32; el resultado se entrega en el dtype de los datos.
+    def __init__(self, n_filas, dtype):
+        self.n = 0
+        self.media = np.zeros(n_filas)
+        self.m2 = np.zeros(n_filas)
+        self.maximo = np.full(n_filas, -np.inf)
+        self.minimo = np.full(n_filas, np.inf)
+        self.dtype = dtype
+
+    def agregar(self, bloque):
+        n_b = bloque.shape[1]
+        if n_b == 0:
+            return
+        m = calcular_momentos(bloque)
+        m2_b = m.desviacion ** 2 * n_b
+        n = self.n + n_b
+        delta = m.media - self.media
+        self.media += delta * (n_b / n)
+        self.m2 += m2_b + delta ** 2 * (self.n * n_b / n)
+        self.n = n
+        np.maximum(self.maximo, m.maximo, out=self.maximo)
+        np.minimum(self.minimo, m.minimo, out=self.minimo)
+
+    def resultado(self):
+        flotante = dtype_flotante(self.dtype)
+        return Momentos(self.media.astype(flotante), np.sqrt(self.m2 / self.n).astype(flotante),
+                        self.maximo.astype(self.dtype), self.minimo.astype(self.dtype))
+
+
+def analizar_por_columnas(precios, bytes_por_bloque=BYTES_POR_BLOQUE_DISCO):
+    # Para históricos muy largos (pocas acciones, muchos días) en los que
+    # una sola fila no cabe en el bloque: se recorre por bloques de días.
+    # Cada bloque se solapa una columna con el anterior para no perder la
+    # variación entre bloques. Media y desviación pueden diferir de la
+    # versión por filas en el último bit por el orden de suma.
+    n_acciones, n_dias = precios.shape
+    flotante = dtype_flotante(precios.dtype)
+    columnas = max(2, bytes_por_bloque // (4 * n_acciones * flotante.itemsize))
+
+    precios_acum = _AcumuladorMomentos(n_acciones, precios.dtype)
+    variaciones_acum = _AcumuladorMomentos(n_acciones, flotante)
+
+    for inicio in range(0, n_dias, columnas):
+        fin = min(inicio + columnas, n_dias)
+        bloque = np.asarray(precios[:, inicio:fin])
+        precios_acum.agregar(bloque)
+
+        # Variaciones que terminan en las columnas [inicio, fin)
+        desde = max(inicio - 1, 0)
+        con_solape = bloque if desde == inicio else np.asarray(precios[:, desde:fin])
+        variaciones_acum.agregar(calcular_variaciones(con_solape))
+
+    return ResultadoHistorico(
+        precios_acum.resultado(),
+        variaciones_acum.resultado(),
+        *_valores_portafolio(np.asarray(precios[:, 0]), np.asarray(precios[:, -1])),
+    )
+
+
+def analizar_historico(precios, eje='filas', **kwargs):
+    if eje == 'filas':
+        return analizar_por_filas(precios, **kwargs)
+    if eje == 'columnas':
+        return analizar_por_columnas(precios, **kwargs)
+    raise ValueError(f"eje debe ser 'filas' o 'columnas', no {eje!r}")
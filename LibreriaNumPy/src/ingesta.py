@@ -0,0 +1,229 @@
+import asyncio
+import inspect
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from src.datos import generar_datos
+from src.ventana_movil import VentanaMovil
+
+TAMANO_LOTE = 8192               # ticks por lote entregado al análisis
+MAX_ESPERA = 0.010               # segundos máximos que un tick espera a completar su lote
+MAX_LOTES_PENDIENTES = 8         # lotes en cola antes de frenar a los feeds (contrapresión)
+
+# Bordes del histograma de latencias: 1 µs a 10 s, 20 clases por década
+BORDES_LATENCIA = np.logspace(-6, 1, 141)
+
+# Un mensaje de un feed y un lote entregado al análisis tienen la misma
+# forma: arreglos paralelos de acción, precio y marca de tiempo
+# (time.perf_counter() al emitirse). En un mensaje `marcas` puede ser un
+# escalar común a todos sus ticks.
+LoteTicks = namedtuple('LoteTicks', ['indices', 'precios', 'marcas'])
+
+
+async def feed_simulado(n_acciones, n_ticks, ticks_por_mensaje=1000, ticks_por_segundo=None,
+                        dias_por_bloque=64, semilla=42, dtype=np.float64):
+    # Feed local para pruebas: toma matrices de generar_datos (una por
+    # bloque de días, con semillas consecutivas) y emite sus columnas como
+    # ticks, en mensajes de hasta `ticks_por_mensaje`. Con ticks_por_segundo
+    # el ritmo se limita a esa tasa; si no, emite tan rápido como se consuma.
+    emitidos = 0
+    inicio = time.perf_counter()
+    bloque = 0
+    while emitidos < n_ticks:
+        precios, _, _ = generar_datos(n_acciones, dias_por_bloque, semilla + bloque, dtype)
+        bloque += 1
+        for columna in precios.T:
+            for desde in range(0, n_acciones, ticks_por_mensaje):
+                if emitidos >= n_ticks:
+                    return
+                hasta = min(desde + ticks_por_mensaje, n_acciones, desde + n_ticks - emitidos)
+                yield LoteTicks(np.arange(desde, hasta), columna[desde:hasta], time.perf_counter())
+                emitidos += hasta - desde
+                if ticks_por_segundo:
+                    adelanto = emitidos / ticks_por_segundo - (time.perf_counter() - inicio)
+                    await asyncio.sleep(max(adelanto, 0))
+                else:
+                    await asyncio.sleep(0)
+
+
+class MetricasIngesta:
+    # Ticks y lotes procesados, contrapresión y latencia de cada tick desde
+    # su emisión en el feed hasta que el análisis terminó con su lote.
+    def __init__(self):
+        self.ticks = 0
+        self.lotes = 0
+        self.pausas_contrapresion = 0
+        self.latencias = np.zeros(len(BORDES_LATENCIA) + 1, dtype=np.int64)
+        self.latencia_maxima = 0.0
+        self.inicio = None
+        self.fin = None
+
+    def registrar(self, lote, instante):
+        latencias = instante - lote.marcas
+        self.latencias += np.bincount(np.searchsorted(BORDES_LATENCIA, latencias),
+                                      minlength=len(self.latencias))
+        self.latencia_maxima = max(self.latencia_maxima, float(latencias.max()))
+        self.ticks += len(lote.indices)
+        self.lotes += 1
+
+    def percentil_latencia(self, p):
+        # Borde superior de la clase que contiene el percentil p (acotado
+        # por la latencia máxima observada)
+        if self.ticks == 0:
+            return float('nan')
+        clase = int(np.searchsorted(np.cumsum(self.latencias), self.ticks * p / 100))
+        return min(float(BORDES_LATENCIA[min(clase, len(BORDES_LATENCIA) - 1)]), self.latencia_maxima)
+
+    def resumen(self):
+        segundos = (self.fin or time.perf_counter()) - (self.inicio or time.perf_counter())
+        return {
+            'ticks': self.ticks,
+            'lotes': self.lotes,
+            'segundos': segundos,
+            'ticks_por_segundo': self.ticks / segundos if segundos > 0 else float('nan'),
+            'latencia_p50': self.percentil_latencia(50),
+            'latencia_p99': self.percentil_latencia(99),
+            'latencia_maxima': self.latencia_maxima,
+            'pausas_contrapresion': self.pausas_contrapresion,
+        }
+
+
+class Ingestor:
+    # Consume uno o más feeds (iterables asíncronos de LoteTicks), junta los
+    # ticks en lotes de `tamano_lote` (o lo acumulado tras `max_espera`) y
+    # los entrega a `consumidor(lote)`. Un consumidor síncrono (p. ej. el
+    # análisis con NumPy) corre en un hilo aparte para no bloquear el bucle
+    # de eventos. La cola de lotes es acotada: si el análisis se atrasa, los
+    # feeds esperan en lugar de acumular memoria sin límite.
+    def __init__(self, consumidor, tamano_lote=TAMANO_LOTE, max_espera=MAX_ESPERA,
+                 max_lotes_pendientes=MAX_LOTES_PENDIENTES, dtype=np.float64):
+        self.consumidor = consumidor
+        self.tamano_lote = tamano_lote
+        self.max_espera = max_espera
+        self.max_lotes_pendientes = max_lotes_pendientes
+        self.dtype = np.dtype(dtype)
+        self.metricas = MetricasIngesta()
+        self._es_asincrono = inspect.iscoroutinefunction(consumidor)
+        self._nuevo_buffer()
+
+    def _nuevo_buffer(self):
+        self._indices = np.empty(self.tamano_lote, dtype=np.intp)
+        self._precios = np.empty(self.tamano_lote, dtype=self.dtype)
+        self._marcas = np.empty(self.tamano_lote)
+        self._llenos = 0
+        self._primer_tick = None
+
+    async def _despachar(self):
+        # El buffer se reemplaza antes de esperar a la cola, así los demás
+        # feeds siguen llenando uno nuevo mientras este lote espera turno.
+        if self._llenos == 0:
+            return
+        n = self._llenos
+        lote = LoteTicks(self._indices[:n], self._precios[:n], self._marcas[:n])
+        self._nuevo_buffer()
+        if self._cola.full():
+            self.metricas.pausas_contrapresion += 1
+        await self._cola.put(lote)
+
+    async def _agregar(self, mensaje):
+        n = len(mensaje.indices)
+        desde = 0
+        while desde < n:
+            if self._llenos == 0:
+                self._primer_tick = time.perf_counter()
+            k = min(n - desde, self.tamano_lote - self._llenos)
+            hasta = self._llenos + k
+            self._indices[self._llenos:hasta] = mensaje.indices[desde:desde + k]
+            self._precios[self._llenos:hasta] = mensaje.precios[desde:desde + k]
+            marcas = mensaje.marcas
+            self._marcas[self._llenos:hasta] = marcas if np.ndim(marcas) == 0 else marcas[desde:desde + k]
+            self._llenos = hasta
+            desde += k
+            if self._llenos == self.tamano_lote:
+                await self._despachar()
+
+    async def _leer(self, feed):
+        async for mensaje in feed:
+            await self._agregar(mensaje)
+
+    async def _temporizador(self):
+        while True:
+            await asyncio.sleep(self.max_espera)
+            if self._llenos and time.perf_counter() - self._primer_tick >= self.max_espera:
+                await self._despachar()
+
+    async def _consumir(self):
+        while True:
+            lote = await self._cola.get()
+            if lote is None:
+                return
+            if self._es_asincrono:
+                await self.consumidor(lote)
+            else:
+                await asyncio.to_thread(self.consumidor, lote)
+            self.metricas.registrar(lote, time.perf_counter())
+
+    async def _leer_todos(self, feeds):
+        await asyncio.gather(*(self._leer(feed) for feed in feeds))
+        await self._despachar()
+
+    async def ejecutar(self, *feeds):
+        # Corre hasta agotar todos los feeds y procesar el último lote.
+        # Retorna el resumen de métricas. Si el consumidor falla, los feeds
+        # se cancelan (no quedan esperando en una cola que nadie vacía) y se
+        # relanza su excepción; si falla un feed, se cancela el consumidor.
+        self._cola = asyncio.Queue(self.max_lotes_pendientes)
+        self.metricas.inicio = time.perf_counter()
+        consumidor = asyncio.create_task(self._consumir())
+        temporizador = asyncio.create_task(self._temporizador())
+        lectores = asyncio.create_task(self._leer_todos(feeds))
+        fin = None
+        try:
+            await asyncio.wait({lectores, consumidor}, return_when=asyncio.FIRST_COMPLETED)
+            if not consumidor.done():
+                lectores.result()            # relanza el error de un feed
+                # Marca de fin sin bloquear: si el consumidor muere con la
+                # cola llena, la espera termina por él y no por el put
+                fin = asyncio.create_task(self._cola.put(None))
+                await asyncio.wait({fin, consumidor}, return_when=asyncio.FIRST_COMPLETED)
+            await consumidor                 # relanza el error del consumidor
+        finally:
+            for tarea in (temporizador, lectores, consumidor, fin):
+                if tarea is not None and not tarea.done():
+                    tarea.cancel()
+            await asyncio.gather(temporizador, lectores, *(t for t in (fin,) if t),
+                                 return_exceptions=True)
+        self.metricas.fin = time.perf_counter()
+        return self.metricas.resumen()
+
+
+def entregar_a_ventana(motor):
+    # Consumidor que aplica cada lote a una VentanaMovil. Un lote puede traer
+    # varios ticks de la misma acción: se aplican por niveles (1.er tick de
+    # cada acción, luego el 2.º, ...), cada nivel con acciones únicas y
+    # respetando el orden de llegada de cada acción.
+    def consumir(lote):
+        if len(lote.indices) == 0:
+            return
+        orden = np.argsort(lote.indices, kind='stable')
+        ordenados = lote.indices[orden]
+        posiciones = np.arange(len(orden))
+        inicio_grupo = np.r_[True, ordenados[1:] != ordenados[:-1]]
+        ocurrencia = posiciones - np.maximum.accumulate(np.where(inicio_grupo, posiciones, 0))
+        for nivel in range(int(ocurrencia.max()) + 1):
+            seleccion = orden[ocurrencia == nivel]
+            motor.actualizar(lote.precios[seleccion], lote.indices[seleccion])
+    return consumir
+
+
+def simular_ingesta(n_acciones=5000, n_ticks=1_000_000, ventana=60, n_feeds=1,
+                    dtype=np.float64, **opciones):
+    # Ingesta completa contra feeds simulados y una VentanaMovil; retorna
+    # el motor con las métricas al día y el resumen de la ingesta.
+    motor = VentanaMovil(n_acciones, ventana, dtype)
+    ingestor = Ingestor(entregar_a_ventana(motor), dtype=dtype, **opciones)
+    feeds = [feed_simulado(n_acciones, n_ticks // n_feeds, semilla=42 + 1000 * k, dtype=dtype)
+             for k in range(n_feeds)]
+    return motor, asyncio.run(ingestor.ejecutar(*feeds))
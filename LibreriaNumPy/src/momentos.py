@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Tamaño objetivo de cada bloque de filas: cabe en la caché L2 de un núcleo,
+# de modo que media, desviación, máximo y mínimo se calculan sobre datos
+# que ya están en caché en lugar de recorrer la matriz completa cuatro veces.
+BYTES_POR_BLOQUE = 1 << 20
+
+Momentos = namedtuple('Momentos', ['media', 'desviacion', 'maximo', 'minimo'])
+
+
+def dtype_flotante(dtype):
+    # dtype de los resultados: float32 se conserva (sin copias float64
+    # intermedias); enteros y otros tipos se calculan en float64.
+    dtype = np.dtype(dtype)
+    return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+
+
+def filas_por_bloque(matriz, bytes_por_bloque=BYTES_POR_BLOQUE):
+    bytes_por_fila = max(1, matriz.shape[1] * matriz.itemsize)
+    return max(1, bytes_por_bloque // bytes_por_fila)
+
+
+def calcular_momentos(matriz, bytes_por_bloque=BYTES_POR_BLOQUE):
+    # Una sola pasada por bloques de filas: todos los momentos y extremos
+    # por fila que usan calcular_estadisticas, realizar_transformaciones y
+    # calcular_metricas_finales.
+    n_filas = matriz.shape[0]
+    media = np.empty(n_filas, dtype=dtype_flotante(matriz.dtype))
+    desviacion = np.empty(n_filas, dtype=media.dtype)
+    maximo = np.empty(n_filas, dtype=matriz.dtype)
+    minimo = np.empty(n_filas, dtype=matriz.dtype)
+
+    if matriz.shape[1] == 0:
+        # Filas sin valores (p. ej. variaciones de un solo día): máximo y
+        # mínimo no están definidos y todos los momentos son NaN
+        media.fill(np.nan)
+        desviacion.fill(np.nan)
+        maximo = np.full(n_filas, np.nan, dtype=media.dtype)
+        return Momentos(media, desviacion, maximo, maximo.copy())
+
+    paso = filas_por_bloque(matriz, bytes_por_bloque)
+    for inicio in range(0, n_filas, paso):
+        fin = min(inicio + paso, n_filas)
+        bloque = matriz[inicio:fin]
+
+        np.mean(bloque, axis=1, out=media[inicio:fin])
+        np.max(bloque, axis=1, out=maximo[inicio:fin])
+        np.min(bloque, axis=1, out=minimo[inicio:fin])
+
+        desvios = bloque - media[inicio:fin, np.newaxis]
+        np.multiply(desvios, desvios, out=desvios)
+        np.mean(desvios, axis=1, out=desviacion[inicio:fin])
+
+    np.sqrt(desviacion, out=desviacion)
+    return Momentos(media, desviacion, maximo, minimo)
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.analisis import (calcular_estadisticas, calcular_variaciones,
+                          realizar_transformaciones, calcular_metricas_finales)
+from src.momentos import calcular_momentos
+
+# Tiles por hilo: más de uno para repartir bien la carga entre núcleos
+TILES_POR_HILO = 4
+
+
+def hilos_por_defecto():
+    # Variable de entorno NUMPY_HILOS o todos los núcleos. Se lee en cada
+    # llamada (no al importar); un valor inválido o no positivo se ignora.
+    try:
+        n_hilos = int(os.environ.get('NUMPY_HILOS', 0))
+    except ValueError:
+        n_hilos = 0
+    return n_hilos if n_hilos > 0 else os.cpu_count() or 1
+
+
+def _limites_tiles(n_filas, n_hilos, filas_por_tile=None):
+    if filas_por_tile is None:
+        filas_por_tile = max(1, -(-n_filas // (n_hilos * TILES_POR_HILO)))
+    return [(inicio, min(inicio + filas_por_tile, n_filas))
+            for inicio in range(0, n_filas, filas_por_tile)]
+
+
+def mapear_filas(funcion, matriz, *args, n_hilos=None, filas_por_tile=None, **kwargs):
+    # Aplica `funcion` a tiles de filas de `matriz` en un pool de hilos. Los
+    # núcleos de NumPy liberan el GIL, así que los tiles corren en paralelo.
+    # `funcion` debe operar fila a fila y devolver un arreglo (o una tupla de
+    # arreglos) cuya primera dimensión sean las filas del tile: así cada
+    # fila se calcula exactamente igual que en la versión serial.
+    n_hilos = n_hilos or hilos_por_defecto()
+    tiles = _limites_tiles(matriz.shape[0], n_hilos, filas_por_tile)
+    if not tiles:
+        # Sin filas no hay tiles: la salida vacía la da la propia función
+        return funcion(matriz, *args, **kwargs)
+
+    # El primer tile se calcula aparte para conocer forma y dtype de la salida
+    inicio, fin = tiles[0]
+    primero = funcion(matriz[inicio:fin], *args, **kwargs)
+    es_tupla = isinstance(primero, tuple)
+    partes = primero if es_tupla else (primero,)
+    salidas = [np.empty((matriz.shape[0],) + parte.shape[1:], dtype=parte.dtype)
+               for parte in partes]
+    for salida, parte in zip(salidas, partes):
+        salida[inicio:fin] = parte
+
+    def procesar(tile):
+        inicio, fin = tile
+        resultado = funcion(matriz[inicio:fin], *args, **kwargs)
+        for salida, parte in zip(salidas, resultado if es_tupla else (resultado,)):
+            salida[inicio:fin] = parte
+
+    if len(tiles) > 1:
+        with ThreadPoolExecutor(max_workers=min(n_hilos, len(tiles) - 1)) as pool:
+            list(pool.map(procesar, tiles[1:]))
+
+    if not es_tupla:
+        return salidas[0]
+    return type(primero)(*salidas) if hasattr(primero, '_fields') else tuple(salidas)
+
+
+def calcular_momentos_paralelo(matriz, n_hilos=None):
+    return mapear_filas(calcular_momentos, matriz, n_hilos=n_hilos)
+
+
+def calcular_estadisticas_paralelo(precios_acciones, n_hilos=None):
+    return calcular_estadisticas(precios_acciones,
+                                 calcular_momentos_paralelo(precios_acciones, n_hilos))
+
+
+def calcular_variaciones_paralelo(precios_acciones, n_hilos=None):
+    return mapear_filas(calcular_variaciones, precios_acciones, n_hilos=n_hilos)
+
+
+def realizar_transformaciones_paralelo(precios_acciones, dias_proyeccion=5, n_hilos=None):
+    return mapear_filas(realizar_transformaciones, precios_acciones,
+                        dias_proyeccion=dias_proyeccion, n_hilos=n_hilos)
+
+
+def calcular_metricas_finales_paralelo(precios_acciones, variacion_porcentual, n_hilos=None):
+    # Los momentos de las variaciones se calculan en paralelo; las sumas del
+    # portafolio (una columna) quedan seriales para conservar el orden de suma.
+    return calcular_metricas_finales(precios_acciones, variacion_porcentual,
+                                     calcular_momentos_paralelo(variacion_porcentual, n_hilos))
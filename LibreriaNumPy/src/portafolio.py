@@ -0,0 +1,95 @@
+from collections import namedtuple
+
+import numpy as np
+
+EstimacionCovarianza = namedtuple('EstimacionCovarianza', ['covarianza', 'contraccion'])
+
+
+def _centrar(rendimientos_continuos, dtype=None):
+    # Acciones x días → desvíos respecto de la media de cada acción.
+    # dtype=None conserva el de los rendimientos (float32 se queda en float32).
+    rendimientos = np.asarray(rendimientos_continuos, dtype=dtype)
+    return rendimientos - rendimientos.mean(axis=1, keepdims=True)
+
+
+def _contraccion_ledoit_wolf(desvios, muestral):
+    # Intensidad óptima de contracción hacia m·I (Ledoit y Wolf, 2004).
+    # Usa la identidad  Σ_t ||x_t x_tᵀ - S||²_F = Σ_t ||x_t||⁴ - T·||S||²_F,
+    # que evita construir T matrices N x N.
+    n_acciones, n_dias = desvios.shape
+    m = np.trace(muestral) / n_acciones
+    norma_s = np.sum(muestral * muestral)
+    d2 = norma_s - 2 * m * np.trace(muestral) + m * m * n_acciones       # ||S - m·I||²
+    normas_cuadradas = np.einsum('ij,ij->j', desvios, desvios)               # ||x_t||²
+    b2 = (np.sum(normas_cuadradas ** 2) - n_dias * norma_s) / n_dias ** 2
+    b2 = min(b2, d2)
+    return 0.0 if d2 == 0 else b2 / d2
+
+
+def matriz_covarianza(rendimientos_continuos, contraccion=None, dtype=None):
+    # Covarianza N x N entre acciones con un único producto matricial (BLAS
+    # GEMM/SYRK), en lugar de np.cov sobre copias intermedias.
+    #   contraccion=None          → covarianza muestral (ddof=1)
+    #   contraccion='ledoit_wolf' → contracción óptima hacia m·I
+    #   contraccion=float en [0,1] → intensidad fija
+    # Con más acciones que días la muestral es singular: usar contracción
+    # para poder invertirla (pesos de mínima varianza).
+    desvios = _centrar(rendimientos_continuos, dtype)
+    n_acciones, n_dias = desvios.shape
+
+    if contraccion is None:
+        covarianza = desvios @ desvios.T
+        covarianza /= n_dias - 1
+        return EstimacionCovarianza(covarianza, 0.0)
+
+    muestral = desvios @ desvios.T
+    muestral /= n_dias
+    if contraccion == 'ledoit_wolf':
+        intensidad = _contraccion_ledoit_wolf(desvios, muestral)
+    else:
+        intensidad = float(contraccion)
+        if not 0.0 <= intensidad <= 1.0:
+            raise ValueError(f'contraccion debe estar en [0, 1], no {intensidad}')
+
+    objetivo = np.trace(muestral) / n_acciones
+    covarianza = muestral
+    covarianza *= 1.0 - intensidad
+    covarianza[np.diag_indices(n_acciones)] += intensidad * objetivo
+    return EstimacionCovarianza(covarianza, intensidad)
+
+
+def matriz_correlacion(covarianza):
+    desviaciones = np.sqrt(np.diag(covarianza))
+    correlacion = covarianza / desviaciones[:, np.newaxis]
+    correlacion /= desviaciones[np.newaxis, :]
+    np.fill_diagonal(correlacion, 1.0)
+    return correlacion
+
+
+def pesos_por_posicion(precios_acciones, acciones_poseidas=100):
+    # Pesos por valor de mercado al cierre; acciones_poseidas puede ser un
+    # escalar (misma cantidad en todas) o un vector con una cantidad por acción.
+    valor = precios_acciones[:, -1] * acciones_poseidas
+    return valor / np.sum(valor)
+
+
+def volatilidad_portafolio(pesos, covarianza):
+    # σ_p = √(wᵀ Σ w). Acepta un vector de pesos (N) o varios portafolios
+    # a la vez (K x N), evaluados con un solo producto matricial.
+    pesos = np.asarray(pesos, dtype=covarianza.dtype)
+    if pesos.ndim == 1:
+        return np.sqrt(pesos @ covarianza @ pesos)
+    return np.sqrt(np.einsum('kn,kn->k', pesos @ covarianza, pesos))
+
+
+def pesos_minima_varianza(covarianza):
+    # w = Σ⁻¹·1 / (1ᵀ·Σ⁻¹·1): se resuelve un sistema lineal (LAPACK gesv)
+    # en lugar de invertir la matriz.
+    unos = np.ones(covarianza.shape[0], dtype=covarianza.dtype)
+    try:
+        solucion = np.linalg.solve(covarianza, unos)
+    except np.linalg.LinAlgError as error:
+        raise np.linalg.LinAlgError(
+            'La covarianza es singular; '
+            "use matriz_covarianza(..., contraccion='ledoit_wolf')") from error
+    return solucion / np.sum(solucion)
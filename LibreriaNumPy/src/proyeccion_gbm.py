@@ -0,0 +1,33 @@
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+ParametrosGBM = namedtuple('ParametrosGBM', ['deriva', 'volatilidad'])
+
+
+def calibrar_gbm(rendimientos_continuos):
+    # En un movimiento browniano geométrico los rendimientos logarítmicos
+    # diarios son normales: su media es la deriva logarítmica (μ - σ²/2)
+    # y su desviación muestral es la volatilidad diaria σ.
+    deriva = np.mean(rendimientos_continuos, axis=1)
+    volatilidad = np.std(rendimientos_continuos, axis=1, ddof=1)
+    return ParametrosGBM(deriva, volatilidad)
+
+
+def bandas_gbm(precios_actuales, parametros, horizonte=5, percentiles=PERCENTILES):
+    # Bandas de percentiles de precio por acción y día proyectado.
+    # Retorna un arreglo (len(percentiles) x acciones x horizonte).
+    #
+    # En un GBM log(S_t / S_0) ~ N(μ·t, σ²·t) para cada acción y día, así
+    # que el percentil p es exactamente S_0 · exp(μ·t + σ·√t·Φ⁻¹(p)): no
+    # hace falta simular (una simulación sólo aproximaría Φ⁻¹).
+    precios_actuales = np.asarray(precios_actuales, dtype=np.float64)
+    normal = NormalDist()
+    z = np.array([normal.inv_cdf(p / 100) for p in percentiles])[:, np.newaxis, np.newaxis]
+    t = np.arange(1, horizonte + 1)
+    exponente = (np.asarray(parametros.deriva, dtype=np.float64)[:, np.newaxis] * t
+                 + np.asarray(parametros.volatilidad, dtype=np.float64)[:, np.newaxis] * np.sqrt(t) * z)
+    return precios_actuales[:, np.newaxis] * np.exp(exponente)
@@ -0,0 +1,352 @@
+import html
+import re
+from collections import namedtuple
+from functools import cache
+from itertools import groupby
+
+import numpy as np
+
+FORMATOS = ('terminal', 'markdown', 'csv', 'html')
+ELIPSIS = '…'
+ELIPSIS_FILAS = '⋮'
+
+# Exponente decimal mínimo que el CSV escribe en notación posicional; por
+# debajo (como hace '%g') se recurre a la notación científica
+EXPONENTE_MINIMO_CSV = -4
+# Celdas que el CSV formatea de una vez (los temporales caben en caché)
+CELDAS_POR_BLOQUE_CSV = 1 << 16
+
+# Una tabla se describe por columnas y se formatea completa de una vez:
+#   etiquetas   → nombre de cada fila (p. ej. la acción)
+#   encabezados → nombre de cada columna
+#   valores     → matriz N x K o lista de K columnas (arreglos o listas)
+#   formatos    → formato % de cada celda para terminal (uno o uno por columna)
+#   formatos_encabezado → formato % de cada encabezado para terminal
+Tabla = namedtuple('Tabla', [
+    'titulo', 'etiqueta_filas', 'etiquetas', 'encabezados', 'valores',
+    'formatos', 'formatos_encabezado', 'formato_etiqueta',
+], defaults=('%12s', '%-12s'))
+
+
+def _por_columna(formato, n_columnas):
+    return [formato] * n_columnas if isinstance(formato, str) else list(formato)
+
+
+def _indices_recortados(total, maximo):
+    # Primeras y últimas posiciones; None marca el lugar de la elipsis
+    if not maximo or total <= maximo:
+        return list(range(total))
+    izquierda = maximo // 2
+    derecha = maximo - izquierda
+    return list(range(izquierda)) + [None] + list(range(total - derecha, total))
+
+
+def _columnas(valores):
+    if isinstance(valores, np.ndarray):
+        return [valores[:, j] for j in range(valores.shape[1])]
+    return [np.asarray(columna) for columna in valores]
+
+
+def _sin_ancho(formato):
+    # '$%10.2f ' → '$%.2f' : el mismo formato sin relleno, para markdown/html
+    return re.sub(r'%-?\d+', '%', formato).strip()
+
+
+def _recortar(tabla, max_filas, max_columnas, listas=True):
+    n_columnas = len(tabla.encabezados)
+    filas = _indices_recortados(len(tabla.etiquetas), max_filas)
+    columnas = _indices_recortados(n_columnas, max_columnas)
+    formatos = _por_columna(tabla.formatos, n_columnas)
+    formatos_encabezado = _por_columna(tabla.formatos_encabezado, n_columnas)
+
+    seleccion_filas = np.array([i for i in filas if i is not None], dtype=np.intp)
+    todas = _columnas(tabla.valores)
+    etiquetas = np.asarray(tabla.etiquetas, dtype=object)[seleccion_filas].tolist()
+
+    encabezados, celdas, fmt_celdas, fmt_encabezados = [], [], [], []
+    for j in columnas:
+        if j is None:
+            ancho = len(formatos_encabezado[0] % '')
+            encabezados.append(ELIPSIS)
+            celdas.append([ELIPSIS] * len(seleccion_filas) if listas
+                          else np.full(len(seleccion_filas), ELIPSIS, dtype=object))
+            fmt_celdas.append(f'%{ancho}s')
+            fmt_encabezados.append(f'%{ancho}s')
+            continue
+        encabezados.append(tabla.encabezados[j])
+        columna = todas[j][seleccion_filas]
+        celdas.append(columna.tolist() if listas else columna)
+        fmt_celdas.append(formatos[j])
+        fmt_encabezados.append(formatos_encabezado[j])
+
+    # Posición (dentro de las filas seleccionadas) donde va la fila elíptica
+    corte = filas.index(None) if None in filas else None
+    return etiquetas, encabezados, celdas, fmt_celdas, fmt_encabezados, corte
+
+
+def _terminal(tabla, max_filas, max_columnas, ancho_separador=80):
+    etiquetas, encabezados, celdas, fmt_celdas, fmt_encabezados, corte = \
+        _recortar(tabla, max_filas, max_columnas)
+    formato_fila = tabla.formato_etiqueta + ''.join(fmt_celdas)
+    formato_encabezado = tabla.formato_etiqueta + ''.join(fmt_encabezados)
+
+    lineas = [formato_encabezado % (tabla.etiqueta_filas, *encabezados), '-' * ancho_separador]
+    filas = [formato_fila % fila for fila in zip(etiquetas, *celdas)]
+    if corte is not None:
+        filas.insert(corte, tabla.formato_etiqueta % ELIPSIS_FILAS)
+    lineas.extend(filas)
+    return '\n'.join(lineas)
+
+
+def _markdown(tabla, max_filas, max_columnas):
+    etiquetas, encabezados, celdas, fmt_celdas, _, corte = \
+        _recortar(tabla, max_filas, max_columnas)
+    formato_fila = '| %s | ' + ' | '.join(_sin_ancho(f) for f in fmt_celdas) + ' |'
+
+    lineas = [f'### {tabla.titulo}', '',
+              '| ' + ' | '.join([tabla.etiqueta_filas, *encabezados]) + ' |',
+              '|' + '---|' + '---:|' * len(encabezados)]
+    filas = [formato_fila % fila for fila in zip(etiquetas, *celdas)]
+    if corte is not None:
+        filas.insert(corte, f'| {ELIPSIS_FILAS} |' + ' |' * len(encabezados))
+    lineas.extend(filas)
+    return '\n'.join(lineas)
+
+
+def _html(tabla, max_filas, max_columnas):
+    etiquetas, encabezados, celdas, fmt_celdas, _, corte = \
+        _recortar(tabla, max_filas, max_columnas)
+    formato_fila = ('<tr><th>%s</th>'
+                    + ''.join(f'<td>{_sin_ancho(f)}</td>' for f in fmt_celdas) + '</tr>')
+
+    filas = [formato_fila % (html.escape(str(fila[0])), *fila[1:])
+             for fila in zip(etiquetas, *celdas)]
+    if corte is not None:
+        filas.insert(corte, f'<tr><th>{ELIPSIS_FILAS}</th>{"<td></td>" * len(encabezados)}</tr>')
+    cabecera = ''.join(f'<th>{html.escape(str(h))}</th>'
+                       for h in [tabla.etiqueta_filas, *encabezados])
+    return '\n'.join([f'<h3>{html.escape(tabla.titulo)}</h3>', '<table>',
+                      f'<thead><tr>{cabecera}</tr></thead>', '<tbody>',
+                      *filas, '</tbody>', '</table>'])
+
+
+@cache
+def _tablas_digitos():
+    # Texto ASCII de cada bloque de 4 dígitos (0000-9999) como un uint32, y
+    # cuántos ceros finales tiene cada bloque (se construyen al primer uso)
+    bloques = np.array([list(f'{i:04d}'.encode('ascii')) for i in range(10000)],
+                       dtype=np.uint8).view(np.uint32).ravel()
+    ceros = np.array([4] + [len(f'{i}') - len(f'{i}'.rstrip('0')) for i in range(1, 10000)])
+    return bloques, ceros
+
+
+def _digitos(mantisas, n_digitos):
+    # Dígitos ASCII (N x n_digitos, con ceros a la izquierda) de enteros
+    # < 1e16 guardados en float64, por bloques de 4 dígitos, y cuántos ceros
+    # finales tiene cada uno
+    bloques, ceros_finales = _tablas_digitos()
+    alto = np.floor(mantisas / 1e8)
+    bajo = (mantisas - alto * 1e8).astype(np.int32)
+    partes = np.empty((len(mantisas), 4), dtype=np.int32)
+    np.divmod(alto.astype(np.int32), 10000, out=(partes[:, 0], partes[:, 1]))
+    np.divmod(bajo, 10000, out=(partes[:, 2], partes[:, 3]))
+    ceros = ceros_finales[partes[:, 3]]
+    for k in (2, 1, 0):
+        nulos = np.flatnonzero(ceros == 4 * (3 - k))
+        ceros[nulos] += ceros_finales[partes[nulos, k]]
+    return bloques[partes].view(np.uint8)[:, 16 - n_digitos:], ceros
+
+
+def _redondear(absolutos, exponentes, cifras):
+    # round(|v| * 10**(cifras-1-e)) con el redondeo del valor exacto, como
+    # printf: si el producto en float64 cae justo en ,5 se decide con su
+    # error de redondeo (producto exacto de Dekker)
+    potencias = 10.0 ** (cifras - 1 - exponentes)
+    productos = absolutos * potencias
+    mantisas = np.rint(productos)
+    empates = np.flatnonzero(productos - np.floor(productos) == 0.5)
+    if len(empates):
+        a, b, p = absolutos[empates], potencias[empates], productos[empates]
+        a_alto = a * 134217729.0
+        a_alto -= a_alto - a
+        b_alto = b * 134217729.0
+        b_alto -= b_alto - b
+        a_bajo, b_bajo = a - a_alto, b - b_alto
+        error = ((a_alto * b_alto - p) + a_alto * b_bajo + a_bajo * b_alto) + a_bajo * b_bajo
+        mantisas[empates] = np.where(error > 0, np.ceil(p),
+                                     np.where(error < 0, np.floor(p), mantisas[empates]))
+    return mantisas
+
+
+def _texto_flotantes(valores):
+    # Formatea en bloque un arreglo de flotantes con el mismo texto que
+    # '%.{cifras}g' % v, donde cifras son las significativas del dtype (15 en
+    # float64, 6 en float32). Devuelve bytes ASCII de ancho fijo (forma de
+    # valores x ancho) rellenos con 0. Solo nan/inf y los valores que '%g'
+    # escribe en notación científica pasan por el formato de Python.
+    cifras = min(np.finfo(valores.dtype).precision, 15)
+    plano = np.asarray(valores, dtype=np.float64).ravel()
+    absolutos = np.abs(plano)
+    positivos = np.isfinite(plano) & (absolutos > 0)
+    exponentes = np.zeros(len(plano), dtype=np.int64)
+    exponentes[positivos] = np.floor(np.log10(absolutos[positivos]))
+    en_rango = (exponentes >= EXPONENTE_MINIMO_CSV - 1) & (exponentes <= cifras)
+    absolutos = np.where(positivos & en_rango, absolutos, 0.0)
+    exponentes[~en_rango] = 0
+
+    # log10 puede errar en una unidad junto a potencias de 10, y el redondeo
+    # puede llevar 9,99… a 10,0…: se corrige el exponente en esas filas
+    mantisas = _redondear(absolutos, exponentes, cifras)
+    for paso, fuera in ((-1, lambda m: m < 10 ** (cifras - 1)), (1, lambda m: m >= 10 ** cifras)):
+        filas = np.flatnonzero(fuera(mantisas) & (absolutos > 0))
+        exponentes[filas] += paso
+        mantisas[filas] = _redondear(absolutos[filas], exponentes[filas], cifras)
+
+    posicionales = ((positivos | (plano == 0)) & en_rango
+                    & (exponentes >= EXPONENTE_MINIMO_CSV) & (exponentes < cifras))
+    digitos, ceros = _digitos(np.where(posicionales, mantisas, 0.0), cifras)
+    # Índice del último dígito que se escribe: sin ceros finales en la parte
+    # decimal, pero conservando los de la parte entera
+    ultimos = np.where(mantisas > 0, cifras - 1 - ceros, 0)
+    filas = np.flatnonzero(ultimos < cifras - 1)
+    digitos[filas] *= np.arange(cifras) <= np.maximum(ultimos, exponentes)[filas, None]
+
+    # Cada fila: signo, prefijo '0.000' de los valores < 1 y los dígitos
+    # intercalados con un hueco tras cada uno, donde va el punto decimal. Lo
+    # que no se escribe queda en 0 y se descarta al unir el texto.
+    ancho = 2 * cifras + 2 - EXPONENTE_MINIMO_CSV
+    texto = np.zeros((len(plano), ancho), dtype=np.uint8)
+    texto[:, 0] = np.where(np.signbit(plano), ord('-'), 0)
+    inicio = 2 - EXPONENTE_MINIMO_CSV
+    texto[:, inicio::2] = digitos
+
+    filas = np.flatnonzero(posicionales & (exponentes >= 0) & (ultimos > exponentes))
+    texto[filas, inicio + 1 + 2 * exponentes[filas]] = ord('.')
+    filas = np.flatnonzero(posicionales & (exponentes < 0))
+    texto[filas, 1] = ord('0')
+    texto[filas, 2] = ord('.')
+    texto[filas, 3:inicio] = np.where(np.arange(inicio - 3) < -exponentes[filas, None] - 1,
+                                      ord('0'), 0)
+
+    formato = f'%.{cifras}g'
+    for i in np.flatnonzero(~posicionales):
+        campo = np.frombuffer((formato % plano[i]).encode('ascii'), dtype=np.uint8)
+        texto[i] = 0
+        texto[i, :len(campo)] = campo
+    return texto.reshape(*np.shape(valores), ancho)
+
+
+def _campo_csv(valor):
+    texto = '' if valor is None else str(valor)
+    if re.search(r'[",\r\n]', texto):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+
+def _texto_campos(valores):
+    # Campos de texto (etiquetas, columnas no numéricas) como bytes UTF-8 de
+    # ancho fijo N x ancho, rellenos con 0
+    campos = np.array([_campo_csv(valor).encode('utf-8') for valor in valores], dtype=np.bytes_)
+    return campos.view(np.uint8).reshape(len(campos), campos.dtype.itemsize)
+
+
+def _bytes_a_texto(filas):
+    return filas.tobytes().translate(None, b'\0').decode('utf-8')
+
+
+def _filas_csv(etiquetas, celdas):
+    # Texto CSV de un bloque de filas (sin salto de línea final). Las columnas
+    # flotantes se formatean juntas y cada fila se arma como bytes de ancho
+    # fijo; el relleno (0) se descarta al final en una sola pasada.
+    n_filas = len(etiquetas)
+    separador = np.full((n_filas, 1), ord(','), dtype=np.uint8)
+    bloques = [_texto_campos(etiquetas)]
+    for flotante, grupo in groupby(celdas, key=lambda columna: columna.dtype.kind == 'f'):
+        if flotante:
+            texto = _texto_flotantes(np.column_stack(list(grupo)))
+            # Solo las posiciones que alguna celda del bloque usa
+            texto = texto[:, :, texto.any(axis=(0, 1))]
+            campos = np.empty((*texto.shape[:2], texto.shape[2] + 1), dtype=np.uint8)
+            campos[:, :, 0] = ord(',')
+            campos[:, :, 1:] = texto
+            bloques.append(campos.reshape(n_filas, campos.shape[1] * campos.shape[2]))
+        else:
+            for columna in grupo:
+                bloques.extend([separador, _texto_campos(columna.tolist())])
+    bloques.append(np.full((n_filas, 1), ord('\n'), dtype=np.uint8))
+    filas = np.concatenate(bloques, axis=1)
+    filas[-1, -1] = 0
+    return _bytes_a_texto(filas)
+
+
+def _csv(tabla, max_filas, max_columnas):
+    # CSV conserva los valores con todas las cifras del dtype. Se formatea
+    # por bloques de ~CELDAS_POR_BLOQUE_CSV celdas para que los temporales
+    # quepan en caché.
+    etiquetas, encabezados, celdas, _, _, corte = \
+        _recortar(tabla, max_filas, max_columnas, listas=False)
+    n_filas = len(etiquetas)
+    paso = max(1, CELDAS_POR_BLOQUE_CSV // max(1, len(celdas)))
+
+    lineas = [','.join(_campo_csv(h) for h in [tabla.etiqueta_filas, *encabezados])]
+    tramos = [(0, n_filas)] if corte is None else [(0, corte), (corte, n_filas)]
+    for k, (desde, hasta) in enumerate(tramos):
+        if k:
+            # Fila que marca las filas omitidas, como en los demás formatos
+            lineas.append(ELIPSIS_FILAS + ',' * len(encabezados))
+        for inicio in range(desde, hasta, paso):
+            fin = min(inicio + paso, hasta)
+            lineas.append(_filas_csv(etiquetas[inicio:fin],
+                                     [columna[inicio:fin] for columna in celdas]))
+    return '\n'.join(lineas)
+
+
+_RENDERIZADORES = {'terminal': _terminal, 'markdown': _markdown, 'html': _html, 'csv': _csv}
+
+
+def renderizar(tabla, formato='terminal', max_filas=None, max_columnas=None, filas_por_pagina=None):
+    # Devuelve la tabla completa como un único str. Con max_filas/max_columnas
+    # se muestran las primeras y últimas filas/columnas con una elipsis; con
+    # filas_por_pagina la tabla se divide en páginas, cada una con encabezado.
+    if formato not in _RENDERIZADORES:
+        raise ValueError(f'formato debe ser uno de {FORMATOS}, no {formato!r}')
+    renderizador = _RENDERIZADORES[formato]
+
+    n_filas = len(tabla.etiquetas)
+    if not filas_por_pagina or n_filas <= filas_por_pagina:
+        return renderizador(tabla, max_filas, max_columnas)
+
+    columnas = _columnas(tabla.valores)
+    n_paginas = -(-n_filas // filas_por_pagina)
+    paginas = []
+    for k, inicio in enumerate(range(0, n_filas, filas_por_pagina), start=1):
+        fin = min(inicio + filas_por_pagina, n_filas)
+        pagina = tabla._replace(
+            titulo=f'{tabla.titulo} (página {k}/{n_paginas})',
+            etiquetas=tabla.etiquetas[inicio:fin],
+            valores=[columna[inicio:fin] for columna in columnas],
+        )
+        texto = renderizador(pagina, None, max_columnas)
+        if formato == 'terminal':
+            texto = f'[página {k}/{n_paginas}]\n{texto}'
+        paginas.append(texto)
+    return '\n\n'.join(paginas)
+
+
+def escribir_tablas(tablas, ruta, formato='markdown', titulo=None, **opciones):
+    # Renderiza todas las tablas y escribe el archivo de una sola vez
+    partes = [renderizar(tabla, formato, **opciones) for tabla in tablas]
+    if formato == 'markdown':
+        documento = (f'# {titulo}\n\n' if titulo else '') + '\n\n'.join(partes) + '\n'
+    elif formato == 'html':
+        encabezado = f'<h1>{html.escape(titulo)}</h1>\n' if titulo else ''
+        documento = ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head><body>\n'
+                     + encabezado + '\n'.join(partes) + '\n</body></html>\n')
+    elif formato == 'csv':
+        # Un bloque por tabla, precedido por su título como comentario
+        documento = '\n\n'.join(f'# {t.titulo}\n{p}' for t, p in zip(tablas, partes)) + '\n'
+    else:
+        documento = '\n\n'.join(partes) + '\n'
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write(documento)
+    return ruta
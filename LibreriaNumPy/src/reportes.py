@@ -1,82 +1,210 @@
-import time
-import numpy as np
-
-def imprimir_cabecera():
-    print("=" * 80)
-    print("ANÁLISIS FINANCIERO CON NUMPY - Caso de Estudio")
-    print("=" * 80)
-
-def imprimir_matriz_precios(nombres, dias, precios):
-    print("\n📊 MATRIZ DE PRECIOS DE ACCIONES (5 acciones x 5 días)")
-    print("-" * 80)
-    print(f"{'Acción':<12}", end="")
-    for dia in dias:
-        print(f"{dia:>12}", end="")
-    print("\n" + "-" * 80)
-    for i, nombre in enumerate(nombres):
-        print(f"{nombre:<12}", end="")
-        for j in range(5):
-            print(f"${precios[i, j]:>10.2f}", end=" ")
-        print()
-
-def imprimir_estadisticas(nombres, promedios, maximos, minimos):
-    print("\n" + "=" * 80)
-    print("ANÁLISIS ESTADÍSTICO")
-    print("=" * 80)
-    print("\n📈 ESTADÍSTICAS POR ACCIÓN")
-    print("-" * 80)
-    print(f"{'Acción':<12} {'Promedio':>12} {'Máximo':>12} {'Mínimo':>12} {'Rango':>12}")
-    print("-" * 80)
-    for i, nombre in enumerate(nombres):
-        rango = maximos[i] - minimos[i]
-        print(f"{nombre:<12} ${promedios[i]:>10.2f} ${maximos[i]:>10.2f} ${minimos[i]:>10.2f} ${rango:>10.2f}")
-
-def imprimir_variaciones(nombres, variacion_porcentual):
-    print("\n📊 VARIACIÓN PORCENTUAL DIARIA (%)")
-    print("-" * 80)
-    print(f"{'Acción':<12} {'Lun→Mar':>12} {'Mar→Mié':>12} {'Mié→Jue':>12} {'Jue→Vie':>12} {'Promedio':>12}")
-    print("-" * 80)
-    for i, nombre in enumerate(nombres):
-        print(f"{nombre:<12}", end="")
-        for j in range(4):
-            print(f"{variacion_porcentual[i, j]:>11.2f}%", end=" ")
-        print(f"{np.mean(variacion_porcentual[i]):>11.2f}%")
-
-def imprimir_analisis_avanzado(nombres, dias, normalizados, proyeccion, precios_originales):
-    print("\n📏 DATOS NORMALIZADOS (Z-Score)")
-    print("-" * 80)
-    print(f"{'Acción':<12}", end="")
-    for dia in dias:
-        print(f"{dia:>12}", end="")
-    print("\n" + "-" * 80)
-    for i, nombre in enumerate(nombres):
-        print(f"{nombre:<12}", end="")
-        for j in range(5):
-            print(f"{normalizados[i, j]:>12.3f}", end="")
-        print()
-
-    print(f"\n📈 PROYECCIÓN DE PRECIOS (Crecimiento 2.0% diario)")
-    print("-" * 80)
-    for i, nombre in enumerate(nombres):
-        print(f"{nombre}: Precio actual ${precios_originales[i, -1]:.2f} → Proyección 5 días ${proyeccion[i, -1]:.2f}")
-
-def imprimir_benchmark(tiempo_numpy, tiempo_python):
-    print("\n" + "=" * 80)
-    print("COMPARACIÓN: NUMPY vs. PYTHON TRADICIONAL")
-    print("=" * 80)
-    print(f"\n⏱️  BENCHMARK: Cálculo de estadísticas en matriz 1000x1000")
-    print("-" * 80)
-    print(f"{'Método':<20} {'Tiempo (s)':>15} {'Velocidad relativa':>20}")
-    print("-" * 80)
-    print(f"{'NumPy (vectorizado)':<20} {tiempo_numpy:>15.6f} {'1x (baseline)':>20}")
-    print(f"{'Python (bucles)':<20} {tiempo_python:>15.6f} {f'{tiempo_python/tiempo_numpy:.1f}x más lento':>20}")
-
-def imprimir_resumen_ejecutivo(v_inicial, v_final, rendimiento, sharpe, nombres):
-    print("\n" + "=" * 80)
-    print("RESUMEN EJECUTIVO")
-    print("=" * 80)
-    print(f"Valor inicial: ${v_inicial:,.2f} | Valor final: ${v_final:,.2f}")
-    print(f"Rendimiento semanal: {rendimiento:.2f}%")
-    print(f"\n⭐ RATIO DE SHARPE POR ACCIÓN:")
-    for i, nombre in enumerate(nombres):
-        print(f"    {nombre}: {sharpe[i]:.3f}")
\ No newline at end of file
+import sys
+
+from src.datos import etiquetas_dias
+from src.render import Tabla, renderizar, escribir_tablas
+
+# Límites para la salida por terminal: con universos grandes se muestran
+# las primeras y últimas filas/columnas en lugar de millones de celdas.
+MAX_FILAS = 40
+MAX_COLUMNAS = 10
+
+def _abreviar(dia):
+    # 'Miércoles' → 'Mié'; etiquetas como 'D12' se dejan tal cual
+    return dia[:3] if dia.isalpha() else dia
+
+def _escribir(lineas, salida=None):
+    # Todo el bloque se arma en memoria y se escribe con una sola llamada
+    (salida or sys.stdout).write('\n'.join(lineas) + '\n')
+
+def _tabla(tabla, max_filas=MAX_FILAS, max_columnas=MAX_COLUMNAS):
+    return renderizar(tabla, 'terminal', max_filas, max_columnas)
+
+# ---------------------------------------------------------------------------
+# Tablas (compartidas por la salida por terminal y por exportar_reporte)
+# ---------------------------------------------------------------------------
+
+def tabla_precios(nombres, dias, precios):
+    return Tabla(f"Matriz de precios ({len(nombres)} acciones x {len(dias)} días)",
+                 'Acción', nombres, dias, precios, '$%10.2f ')
+
+def tabla_estadisticas(nombres, promedios, maximos, minimos):
+    return Tabla("Estadísticas por acción", 'Acción', nombres,
+                 ['Promedio', 'Máximo', 'Mínimo', 'Rango'],
+                 [promedios, maximos, minimos, maximos - minimos],
+                 ' $%10.2f', ' %12s')
+
+def tabla_variaciones(nombres, variacion_porcentual, dias):
+    n_variaciones = variacion_porcentual.shape[1]
+    encabezados = [f'{_abreviar(dias[j])}→{_abreviar(dias[j + 1])}' for j in range(n_variaciones)]
+    columnas = [variacion_porcentual[:, j] for j in range(n_variaciones)]
+    return Tabla("Variación porcentual diaria (%)", 'Acción', nombres,
+                 encabezados + ['Promedio'],
+                 columnas + [variacion_porcentual.mean(axis=1)],
+                 ['%11.2f%% '] * n_variaciones + ['%11.2f%%'], ' %12s')
+
+def tabla_normalizados(nombres, dias, normalizados):
+    return Tabla("Datos normalizados (Z-Score)", 'Acción', nombres, dias, normalizados, '%12.3f')
+
+def tabla_proyeccion_gbm(nombres, precios_actuales, bandas, percentiles):
+    return Tabla(f"Proyección GBM a {bandas.shape[2]} días (percentiles)", 'Acción', nombres,
+                 ['Actual'] + [f'P{p}' for p in percentiles],
+                 [precios_actuales] + [bandas[k, :, -1] for k in range(len(percentiles))],
+                 ' $%10.2f', ' %11s')
+
+def tabla_portafolio(nombres, pesos_actuales, pesos_min_var):
+    return Tabla("Pesos del portafolio (%)", 'Acción', nombres,
+                 ['Peso actual', 'Peso mín. var.'],
+                 [pesos_actuales * 100, pesos_min_var * 100],
+                 [' %13.2f%%', ' %15.2f%%'], [' %14s', ' %16s'])
+
+def tabla_sharpe(nombres, volatilidad, sharpe):
+    return Tabla("Volatilidad y ratio de Sharpe por acción", 'Acción', nombres,
+                 ['Volatilidad', 'Sharpe'], [volatilidad, sharpe], ' %12.3f', ' %12s')
+
+def tabla_suite_benchmark(resultados):
+    # Err. rel.: error respecto de float64; x f64: aceleración respecto de float64
+    nan = float('nan')
+    return Tabla("Benchmark de funciones de análisis", 'Función',
+                 [r['funcion'] for r in resultados],
+                 ['Forma', 'dtype', 'Hilos', 'Mediana (s)', 'IQR (s)', 'Melem/s', 'Err. rel.', 'x f64'],
+                 [[f"{r['forma'][0]}x{r['forma'][1]}" for r in resultados],
+                  [r['dtype'] for r in resultados],
+                  [r.get('hilos', 1) for r in resultados],
+                  [r['mediana'] for r in resultados],
+                  [r['iqr'] for r in resultados],
+                  [r['elementos_por_segundo'] / 1e6 for r in resultados],
+                  [r.get('error_relativo', nan) for r in resultados],
+                  [r.get('aceleracion') or nan for r in resultados]],
+                 [' %11s', ' %8s', ' %5d', ' %12.6f', ' %10.6f', ' %8.1f', ' %9.1e', ' %6.2f'],
+                 [' %11s', ' %8s', ' %5s', ' %12s', ' %10s', ' %8s', ' %9s', ' %6s'], '%-28s')
+
+def tabla_arranque(arranques):
+    return Tabla("Arranque de la CLI (proceso nuevo)", 'Comando',
+                 [f"main.py {a['comando']}" for a in arranques],
+                 ['Mediana (s)', 'IQR (s)', 'Mínimo (s)'],
+                 [[a['mediana'] for a in arranques],
+                  [a['iqr'] for a in arranques],
+                  [a['minimo'] for a in arranques]],
+                 ' %12.3f', ' %12s', '%-28s')
+
+# ---------------------------------------------------------------------------
+# Salida por terminal
+# ---------------------------------------------------------------------------
+
+def imprimir_cabecera(salida=None):
+    _escribir(["=" * 80,
+               "ANÁLISIS FINANCIERO CON NUMPY - Caso de Estudio",
+               "=" * 80], salida)
+
+def imprimir_matriz_precios(nombres, dias, precios, salida=None):
+    _escribir([f"\n📊 MATRIZ DE PRECIOS DE ACCIONES ({len(nombres)} acciones x {len(dias)} días)",
+               "-" * 80,
+               _tabla(tabla_precios(nombres, dias, precios))], salida)
+
+def imprimir_estadisticas(nombres, promedios, maximos, minimos, salida=None):
+    _escribir(["\n" + "=" * 80,
+               "ANÁLISIS ESTADÍSTICO",
+               "=" * 80,
+               "\n📈 ESTADÍSTICAS POR ACCIÓN",
+               "-" * 80,
+               _tabla(tabla_estadisticas(nombres, promedios, maximos, minimos))], salida)
+
+def imprimir_variaciones(nombres, variacion_porcentual, dias=None, salida=None):
+    if dias is None:
+        # M días de precios dan M - 1 variaciones
+        dias = etiquetas_dias(variacion_porcentual.shape[1] + 1)
+    _escribir(["\n📊 VARIACIÓN PORCENTUAL DIARIA (%)",
+               "-" * 80,
+               _tabla(tabla_variaciones(nombres, variacion_porcentual, dias))], salida)
+
+def imprimir_analisis_avanzado(nombres, dias, normalizados, proyeccion, precios_originales,
+                               bandas=None, percentiles=None, salida=None):
+    lineas = ["\n📏 DATOS NORMALIZADOS (Z-Score)",
+              "-" * 80,
+              _tabla(tabla_normalizados(nombres, dias, normalizados))]
+    _escribir(lineas, salida)
+
+    if bandas is not None:
+        imprimir_proyeccion_gbm(nombres, precios_originales[:, -1], bandas, percentiles, salida)
+        return
+
+    lineas = [f"\n📈 PROYECCIÓN DE PRECIOS (mediana GBM, deriva histórica)", "-" * 80]
+    formato = "%s: Precio actual $%.2f → Proyección " + f"{proyeccion.shape[1]}" + " días $%.2f"
+    lineas += [formato % fila for fila in zip(nombres, precios_originales[:, -1].tolist(),
+                                               proyeccion[:, -1].tolist())]
+    _escribir(lineas, salida)
+
+def imprimir_proyeccion_gbm(nombres, precios_actuales, bandas, percentiles, salida=None):
+    _escribir([f"\n📈 PROYECCIÓN A {bandas.shape[2]} DÍAS (GBM, bandas de percentiles)",
+               "-" * 80,
+               _tabla(tabla_proyeccion_gbm(nombres, precios_actuales, bandas, percentiles))],
+              salida)
+
+def imprimir_benchmark(tiempo_numpy, tiempo_python, salida=None):
+    _escribir(["\n" + "=" * 80,
+               "COMPARACIÓN: NUMPY vs. PYTHON TRADICIONAL",
+               "=" * 80,
+               f"\n⏱️  BENCHMARK: Cálculo de estadísticas en matriz 1000x1000",
+               "-" * 80,
+               f"{'Método':<20} {'Tiempo (s)':>15} {'Velocidad relativa':>20}",
+               "-" * 80,
+               f"{'NumPy (vectorizado)':<20} {tiempo_numpy:>15.6f} {'1x (baseline)':>20}",
+               f"{'Python (bucles)':<20} {tiempo_python:>15.6f} "
+               f"{f'{tiempo_python/tiempo_numpy:.1f}x más lento':>20}"], salida)
+
+def imprimir_suite_benchmark(resultados, salida=None):
+    _escribir(["\n" + "=" * 80,
+               "BENCHMARK DE FUNCIONES DE ANÁLISIS (mediana de repeticiones)",
+               "=" * 80,
+               _tabla(tabla_suite_benchmark(resultados), max_filas=None)], salida)
+
+def imprimir_arranque(arranques, salida=None):
+    _escribir(["\n" + "=" * 80,
+               "TIEMPO DE ARRANQUE DE LA CLI",
+               "=" * 80,
+               _tabla(tabla_arranque(arranques), max_filas=None)], salida)
+
+def imprimir_portafolio(nombres, pesos_actuales, pesos_min_var, vol_actual, vol_min_var,
+                        contraccion, salida=None):
+    _escribir(["\n" + "=" * 80,
+               "PORTAFOLIO: COVARIANZA Y MÍNIMA VARIANZA",
+               "=" * 80,
+               f"Contracción Ledoit-Wolf de la covarianza: {contraccion:.3f}",
+               f"Volatilidad diaria portafolio actual     : {vol_actual * 100:.2f}%",
+               f"Volatilidad diaria mínima varianza       : {vol_min_var * 100:.2f}%",
+               "-" * 80,
+               _tabla(tabla_portafolio(nombres, pesos_actuales, pesos_min_var))], salida)
+
+def imprimir_resumen_ejecutivo(v_inicial, v_final, rendimiento, sharpe, nombres, salida=None):
+    lineas = ["\n" + "=" * 80,
+              "RESUMEN EJECUTIVO",
+              "=" * 80,
+              f"Valor inicial: ${v_inicial:,.2f} | Valor final: ${v_final:,.2f}",
+              f"Rendimiento semanal: {rendimiento:.2f}%",
+              f"\n⭐ RATIO DE SHARPE POR ACCIÓN:"]
+    indices = range(len(nombres))
+    if len(nombres) > MAX_FILAS:
+        indices = list(range(MAX_FILAS // 2)) + list(range(len(nombres) - MAX_FILAS // 2, len(nombres)))
+    lineas += [f"    {nombres[i]}: {sharpe[i]:.3f}" for i in indices]
+    if len(nombres) > MAX_FILAS:
+        lineas.insert(len(lineas) - MAX_FILAS // 2, f"    ⋮ ({len(nombres) - MAX_FILAS} acciones más)")
+    _escribir(lineas, salida)
+
+# ---------------------------------------------------------------------------
+# Exportación a archivo (markdown, csv, html o terminal)
+# ---------------------------------------------------------------------------
+
+def exportar_reporte(ruta, formato, nombres, dias, precios, estadisticas, variaciones,
+                     normalizados, volatilidad, sharpe, max_filas=None, max_columnas=None,
+                     filas_por_pagina=None):
+    # estadisticas = (promedios, maximos, minimos)
+    tablas = [
+        tabla_precios(nombres, dias, precios),
+        tabla_estadisticas(nombres, *estadisticas),
+        tabla_variaciones(nombres, variaciones, dias),
+        tabla_normalizados(nombres, dias, normalizados),
+        tabla_sharpe(nombres, volatilidad, sharpe),
+    ]
+    return escribir_tablas(tablas, ruta, formato, titulo="Análisis financiero con NumPy",
+                           max_filas=max_filas, max_columnas=max_columnas,
+                           filas_por_pagina=filas_por_pagina)
@@ -0,0 +1,202 @@
+import numpy as np
+
+from src.momentos import Momentos, dtype_flotante
+
+
+class _ExtremoMovil:
+    # Máximo (np.fmax) o mínimo (np.fmin) de la ventana circular `valores`
+    # de cada fila. La ventana se ve como dos tramos: los valores anteriores
+    # al último recálculo, de los que se guarda el extremo de cada sufijo
+    # (del más antiguo al más reciente), y los llegados después, de los que
+    # basta el extremo acumulado. Agregar un valor es O(1) sin importar la
+    # tendencia de los precios; recalcular una fila es O(ventana) y hace
+    # falta antes de que lleguen `ventana` valores nuevos.
+    def __init__(self, valores, funcion):
+        self.valores = valores
+        self.funcion = funcion
+        self.sufijo = np.full_like(valores, np.nan)
+        self.prefijo = np.full(valores.shape[0], np.nan, dtype=valores.dtype)
+
+    def agregar(self, filas, siguiente, nuevos):
+        # `siguiente`: posición del valor más antiguo de cada fila tras agregar
+        prefijo = self.funcion(self.prefijo[filas], nuevos)
+        self.prefijo[filas] = prefijo
+        return self.funcion(self.sufijo.ravel()[filas * self.valores.shape[1] + siguiente], prefijo)
+
+    def recalcular(self, filas, siguiente):
+        ventana = self.valores.shape[1]
+        indices = (siguiente[:, np.newaxis] + np.arange(ventana)) % ventana
+        ordenados = np.take_along_axis(self.valores[filas], indices, axis=1)
+        sufijos = self.funcion.accumulate(ordenados[:, ::-1], axis=1)[:, ::-1]
+        self.sufijo[filas[:, np.newaxis], indices] = sufijos
+        self.prefijo[filas] = np.nan
+        return sufijos[:, 0]
+
+
+class _EstadisticaMovil:
+    # Ventana circular de `ventana` valores por fila con media y suma de
+    # cuadrados (M2) actualizadas en O(1) por valor nuevo, y máximo y mínimo
+    # en O(1) amortizado (ver _ExtremoMovil).
+    # Los acumuladores (un valor por fila) son float64 aunque el buffer sea
+    # float32. Cada `ventana` valores la media y M2 de la fila se recalculan
+    # desde el buffer para que el error de redondeo no se acumule; el
+    # re-anclaje está escalonado entre filas, así que su costo se reparte.
+    def __init__(self, n_filas, ventana, dtype):
+        self.ventana = ventana
+        self.valores = np.full((n_filas, ventana), np.nan, dtype=dtype)
+        self.n = np.zeros(n_filas, dtype=np.intp)
+        self.posicion = np.zeros(n_filas, dtype=np.intp)
+        self.media = np.zeros(n_filas)
+        self.m2 = np.zeros(n_filas)
+        self.maximo = np.full(n_filas, np.nan, dtype=dtype)
+        self.minimo = np.full(n_filas, np.nan, dtype=dtype)
+        self.desde_anclaje = -(np.arange(n_filas) % ventana)
+        self._maximo = _ExtremoMovil(self.valores, np.fmax)
+        self._minimo = _ExtremoMovil(self.valores, np.fmin)
+        self.desde_extremos = np.zeros(n_filas, dtype=np.intp)
+
+    def agregar(self, filas, nuevos):
+        # `filas` sin repetidos; `nuevos` un valor por fila
+        posicion = self.posicion[filas]
+        salientes = self.valores[filas, posicion]
+        self.valores[filas, posicion] = nuevos
+        self.posicion[filas] = (posicion + 1) % self.ventana
+
+        n = self.n[filas]
+        llena = n == self.ventana
+        n_nuevo = np.minimum(n + 1, self.ventana)
+        self.n[filas] = n_nuevo
+
+        # Ventana llena: entra x y sale s. Ventana creciendo: sólo entra x,
+        # que equivale a la misma fórmula con s = media (Welford).
+        x = nuevos.astype(np.float64)
+        media = self.media[filas]
+        s = np.where(llena, salientes, media)
+        media_nueva = media + (x - s) / n_nuevo
+        m2 = self.m2[filas] + (x - s) * (x - media_nueva + s - media)
+        self.media[filas] = media_nueva
+        self.m2[filas] = np.maximum(m2, 0.0)
+
+        # Extremos: al llenarse la ventana y luego cada `ventana` valores la
+        # fila se recalcula; tras el primer recálculo el ciclo de cada fila
+        # queda desfasado según su número, así el costo se reparte.
+        siguiente = self.posicion[filas]
+        maximo = self._maximo.agregar(filas, siguiente, nuevos)
+        minimo = self._minimo.agregar(filas, siguiente, nuevos)
+        self.desde_extremos[filas] += 1
+        recien_llena = ~llena & (n_nuevo == self.ventana)
+        recalcular = recien_llena | (llena & (self.desde_extremos[filas] >= self.ventana))
+        if recalcular.any():
+            maximo[recalcular] = self._maximo.recalcular(filas[recalcular], siguiente[recalcular])
+            minimo[recalcular] = self._minimo.recalcular(filas[recalcular], siguiente[recalcular])
+            self.desde_extremos[filas[recalcular]] = 0
+            self.desde_extremos[filas[recien_llena]] = filas[recien_llena] % self.ventana
+        self.maximo[filas] = maximo
+        self.minimo[filas] = minimo
+
+        self.desde_anclaje[filas] += 1
+        anclar = llena & (self.desde_anclaje[filas] >= self.ventana)
+        if anclar.any():
+            self._anclar(filas[anclar])
+
+    def _anclar(self, filas):
+        bloque = self.valores[filas].astype(np.float64)
+        media = bloque.mean(axis=1)
+        bloque -= media[:, np.newaxis]
+        self.media[filas] = media
+        self.m2[filas] = np.einsum('ij,ij->i', bloque, bloque)
+        self.desde_anclaje[filas] = 0
+
+    def momentos(self):
+        dtype = dtype_flotante(self.valores.dtype)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(self.n > 0, self.media, np.nan).astype(dtype)
+            desviacion = np.sqrt(self.m2 / self.n).astype(dtype)
+        return Momentos(media, desviacion, self.maximo.copy(), self.minimo.copy())
+
+    def ordenados(self):
+        # Ventana de cada fila del valor más antiguo al más reciente; en las
+        # filas que aún no se llenaron las posiciones libres (NaN) van primero.
+        indices = (self.posicion[:, np.newaxis] + np.arange(self.ventana)) % self.ventana
+        return np.take_along_axis(self.valores, indices, axis=1)
+
+
+class VentanaMovil:
+    # Análisis incremental sobre las últimas `ventana` cotizaciones de cada
+    # acción, con la misma semántica que analisis.py aplicado a esa ventana:
+    #   momentos()           ↔ calcular_momentos / calcular_estadisticas
+    #   momentos_variacion() ↔ calcular_momentos(calcular_variaciones(...))
+    #   metricas()           ↔ volatilidad y Sharpe de calcular_metricas_finales
+    # Cada tick actualiza las acciones recibidas en O(1) amortizado
+    # (vectorizado sobre todas ellas), sin volver a recorrer el histórico.
+    def __init__(self, n_acciones, ventana, dtype=np.float64):
+        if ventana < 2:
+            raise ValueError(f'ventana debe ser al menos 2, no {ventana}')
+        self.n_acciones = n_acciones
+        self.ventana = ventana
+        self.dtype = np.dtype(dtype)
+        self.precios = _EstadisticaMovil(n_acciones, ventana, self.dtype)
+        self.variaciones = _EstadisticaMovil(n_acciones, ventana - 1, self.dtype)
+        self.ultimo_precio = np.full(n_acciones, np.nan, dtype=self.dtype)
+        self.ultima_variacion = np.full(n_acciones, np.nan, dtype=self.dtype)
+        self.ultimo_rendimiento = np.full(n_acciones, np.nan, dtype=self.dtype)
+        self.ticks = 0
+        self._todas = np.arange(n_acciones)
+
+    @classmethod
+    def desde_matriz(cls, precios_acciones, ventana):
+        # Arranca el motor con las últimas `ventana` columnas de un histórico
+        motor = cls(precios_acciones.shape[0], ventana, dtype_flotante(precios_acciones.dtype))
+        motor.actualizar_bloque(precios_acciones[:, -ventana:])
+        return motor
+
+    def actualizar(self, precios, indices=None):
+        # Un tick: un precio por acción (indices=None) o por cada acción de
+        # `indices` (sin repetidos).
+        filas = self._todas if indices is None else np.asarray(indices, dtype=np.intp)
+        precios = np.asarray(precios, dtype=self.dtype)
+        if precios.shape != filas.shape:
+            raise ValueError(f'{precios.shape[0]} precios para {filas.shape[0]} acciones')
+
+        anteriores = self.ultimo_precio[filas]
+        con_previo = ~np.isnan(anteriores)
+        if not con_previo.all():
+            filas_var, anteriores, nuevos = filas[con_previo], anteriores[con_previo], precios[con_previo]
+        else:
+            filas_var, nuevos = filas, precios
+        if filas_var.size:
+            # Mismas operaciones y orden que calcular_variaciones
+            variacion = np.subtract(nuevos, anteriores)
+            np.divide(variacion, anteriores, out=variacion)
+            variacion *= 100
+            self.variaciones.agregar(filas_var, variacion)
+            self.ultima_variacion[filas_var] = variacion
+            self.ultimo_rendimiento[filas_var] = np.log(nuevos) - np.log(anteriores)
+
+        self.precios.agregar(filas, precios)
+        self.ultimo_precio[filas] = precios
+        self.ticks += 1
+
+    def actualizar_bloque(self, precios_acciones, indices=None):
+        # Varios ticks seguidos: matriz (acciones x ticks), columna por columna
+        for columna in np.asarray(precios_acciones, dtype=self.dtype).T:
+            self.actualizar(columna, indices)
+
+    def momentos(self):
+        return self.precios.momentos()
+
+    def estadisticas(self):
+        m = self.momentos()
+        return m.media, m.maximo, m.minimo
+
+    def momentos_variacion(self):
+        return self.variaciones.momentos()
+
+    def metricas(self):
+        # (volatilidad diaria, ratio de Sharpe) por acción sobre la ventana
+        m = self.momentos_variacion()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return m.desviacion, m.media / m.desviacion
+
+    def ventana_precios(self):
+        return self.precios.ordenados()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.benchmark import (COMANDOS_ARRANQUE, LIMITE_ARRANQUE, MODULOS_EXCLUIDOS,
+                           medir_arranque)
+
+
+# Cada comando de COMANDOS_ARRANQUE en un proceso nuevo: debe arrancar dentro
+# de LIMITE_ARRANQUE y no importar ninguno de sus MODULOS_EXCLUIDOS
+@pytest.mark.parametrize('comando', COMANDOS_ARRANQUE, ids=' '.join)
+def test_arranque(comando):
+    assert ' '.join(comando) in MODULOS_EXCLUIDOS
+    resultado, = medir_arranque([comando], repeticiones=3)
+    assert resultado['indebidos'] == []
+    assert resultado['mediana'] <= LIMITE_ARRANQUE